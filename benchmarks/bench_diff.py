@@ -0,0 +1,76 @@
+# Benchmark: month-over-month diff (icicidiff.diff_output_frames) at scale. Parses
+# two sample grids and tiles each output to about the target row count (every
+# tile renames its clusters, so keys stay as distinct as in a bigger grid), times
+# the diff between them, then diffs the newer month against a copy with a known
+# number of payouts changed, rows dropped and rows added, and checks the report.
+#
+#   python benchmarks/bench_diff.py [target rows] [old grid] [new grid]
+import contextlib
+import io
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import iciciparser17 as engine  # noqa: E402
+import icicidiff  # noqa: E402
+
+DEFAULT_OLD_GRID = os.path.join(REPO_ROOT, "icici CV feb25.xlsx")
+DEFAULT_NEW_GRID = os.path.join(REPO_ROOT, "icici CV march25.xlsx")
+DEFAULT_TARGET_ROWS = 200000
+PERTURB_EVERY = 97
+
+
+def tiled_output(grid_path, target_rows):
+    with contextlib.redirect_stdout(io.StringIO()):
+        output_df = icicidiff.load_output_frame(grid_path)
+    repeats = max(1, round(target_rows / len(output_df)))
+    tiles = []
+    for tile_idx in range(repeats):
+        tile = output_df.copy()
+        tile["cluster_code"] = tile["cluster_code"] + f" #{tile_idx}"
+        tiles.append(tile)
+    return engine.pd.concat(tiles, ignore_index=True)
+
+
+def main():
+    target_rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_TARGET_ROWS
+    old_grid = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_OLD_GRID
+    new_grid = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_NEW_GRID
+    old_df = tiled_output(old_grid, target_rows)
+    new_df = tiled_output(new_grid, target_rows)
+    print(f"{os.path.basename(old_grid)} -> {os.path.basename(new_grid)}: {len(old_df)} old rows, {len(new_df)} new rows")
+
+    started = time.perf_counter()
+    report, unchanged_count = icicidiff.diff_output_frames(old_df, new_df)
+    elapsed = time.perf_counter() - started
+    counts = report["change"].value_counts()
+    print(f"  month over month  {elapsed:6.2f}s  ({(len(old_df) + len(new_df)) / elapsed / 1000:.0f}k rows/s)  unchanged={unchanged_count}, "
+          + ", ".join(f"{change}={count}" for change, count in counts.items()))
+
+    # Known edits against the newer month itself: bump payouts, drop rows, add rows
+    # for a cluster that does not exist. The diff must report exactly those.
+    edited = new_df.copy()
+    bumped_rows = edited.index[::PERTURB_EVERY]
+    bumped_rows = bumped_rows[edited.loc[bumped_rows, "po_percent"] != "99.5%"]
+    edited.loc[bumped_rows, "po_percent"] = "99.5%"
+    dropped_rows = edited.index[PERTURB_EVERY // 2::PERTURB_EVERY]
+    edited = edited.drop(index=dropped_rows)
+    added = new_df.iloc[:len(dropped_rows)].copy()
+    added["cluster_code"] = "NEW CLUSTER"
+    edited = engine.pd.concat([edited, added], ignore_index=True)
+
+    started = time.perf_counter()
+    report, unchanged_count = icicidiff.diff_output_frames(new_df, edited)
+    elapsed = time.perf_counter() - started
+    counts = report["change"].value_counts()
+    expected = {"changed": len(bumped_rows), "removed": len(dropped_rows), "added": len(added)}
+    status = "as expected" if counts.to_dict() == expected else f"EXPECTED {expected}"
+    print(f"  known edits       {elapsed:6.2f}s  ({(len(new_df) + len(edited)) / elapsed / 1000:.0f}k rows/s)  unchanged={unchanged_count}, "
+          + ", ".join(f"{change}={count}" for change, count in counts.items()) + f"  {status}")
+
+
+if __name__ == "__main__":
+    main()
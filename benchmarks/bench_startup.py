@@ -0,0 +1,66 @@
+# Benchmark: interpreter startup cost of the engine, measured with
+# `python -X importtime` in fresh subprocesses. Reports the engine's cumulative
+# import time, the heaviest modules by self time, whether pandas/numpy were
+# imported, and wall time for `--help` versus a run that first touches pandas.
+#
+#   python benchmarks/bench_startup.py [runs]
+import os
+import py_compile
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENGINE_PATH = os.path.join(REPO_ROOT, "iciciparser17.py")
+ENGINE_MODULE = "iciciparser17"
+HEAVY_MODULES = ("pandas", "numpy", "openpyxl")
+TOP_MODULES = 8
+
+SCENARIOS = [
+    ("import engine", ["-c", f"import {ENGINE_MODULE}"]),
+    ("--help", [ENGINE_PATH, "--help"]),
+    ("import engine + first pandas use", ["-c", f"import {ENGINE_MODULE}; {ENGINE_MODULE}.pd.DataFrame"]),
+]
+
+
+def run_importtime(args):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-X", "importtime", *args], env=env, cwd=REPO_ROOT,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    wall_seconds = time.perf_counter() - started
+    modules = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module_name = line[len("import time:"):].split("|")
+        modules.append((module_name.strip(), int(self_us), int(cumulative_us)))
+    return wall_seconds, modules
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    # Fresh bytecode, so the numbers do not include compiling the engine source.
+    py_compile.compile(ENGINE_PATH)
+    for label, args in SCENARIOS:
+        wall_times = []
+        engine_times = []
+        for _ in range(runs):
+            wall_seconds, modules = run_importtime(args)
+            wall_times.append(wall_seconds)
+            engine_times.append(sum(cumulative for name, _, cumulative in modules if name == ENGINE_MODULE) / 1000)
+        imported = {name.split(".")[0] for name, _, _ in modules}
+        heavy = ", ".join(name for name in HEAVY_MODULES if name in imported) or "none"
+        print(f"{label}:")
+        print(f"  wall median {statistics.median(wall_times) * 1000:8.1f} ms over {runs} runs")
+        if any(engine_times):
+            print(f"  {ENGINE_MODULE} cumulative import median {statistics.median(engine_times):8.1f} ms")
+        print(f"  heavy modules imported: {heavy}")
+        print("  top modules by self time (last run):")
+        for name, self_us, _ in sorted(modules, key=lambda module: module[1], reverse=True)[:TOP_MODULES]:
+            print(f"    {self_us / 1000:8.2f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
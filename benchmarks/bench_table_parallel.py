@@ -0,0 +1,129 @@
+# Benchmark: intra-table parallel cell parsing. Tiles the data rows of a grid's
+# first table until the table holds about the target number of cells, then times
+# process_sheet serially and with PARALLEL_TABLE_WORKERS = 2, 4, ... up to the
+# given maximum, for each partition ("rows": equal row ranges, "cost": equal
+# estimated parse cost) at 1 and PARALLEL_TABLE_CHUNKS_PER_WORKER chunks per
+# worker, and checks every run yields exactly the serial rows.
+#
+# Two table layouts are run: "tiled" repeats the table as is; "clustered" moves
+# the rows with the costliest cells to the bottom of the table, as in grids whose
+# last clusters carry the multi-line conditions. Besides wall time each run
+# reports a projected efficiency: every row's serial parse time (cell caches
+# cleared first, as for a table whose texts are all new) is summed per chunk and
+# the chunks are replayed on that many cores the way the pool hands them out
+# (next chunk to the first idle worker), giving total work / (workers x makespan).
+# Wall-clock efficiency needs a host with at least that many idle cores; the
+# projection compares how evenly each partition spreads the work on any host.
+#
+#   python benchmarks/bench_table_parallel.py [grid.xlsx] [target cells] [max workers]
+import contextlib
+import heapq
+import io
+import os
+import sys
+import time
+from collections import defaultdict
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import iciciparser17 as engine  # noqa: E402
+
+DEFAULT_GRID = os.path.join(REPO_ROOT, "icici CV march25.xlsx")
+DEFAULT_TARGET_CELLS = 200000
+PARTITIONS = ("rows", "cost")
+DEFAULT_CHUNKS_PER_WORKER = engine.PARALLEL_TABLE_CHUNKS_PER_WORKER
+
+
+def projected_efficiency(row_seconds, row_ranges, workers):
+    chunk_seconds = [sum(row_seconds[start:end]) for start, end in row_ranges]
+    worker_free_at = [0.0] * workers
+    for seconds in chunk_seconds:
+        heapq.heappush(worker_free_at, heapq.heappop(worker_free_at) + seconds)
+    makespan = max(worker_free_at)
+    return sum(chunk_seconds) / (workers * makespan) if makespan else 1.0
+
+
+def estimated_row_cost(row_values):
+    return sum(engine.estimate_cell_cost(engine.classify_cell_value(value)[0], value) for value in row_values)
+
+
+def load_tiled_sheet(grid_path, target_cells, clustered=False):
+    pd = engine.pd
+    xls = pd.ExcelFile(grid_path)
+    df_sheet = pd.read_excel(xls, sheet_name=xls.sheet_names[0], header=None, keep_default_na=False, na_filter=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        header_row_idx = engine.find_header_row(df_sheet, "RTO CLUSTER")
+    header_row = df_sheet.iloc[header_row_idx].astype(str).str.upper().str.strip()
+    rto_cluster_col_idx = df_sheet.columns.get_loc(header_row[header_row.str.contains("RTO CLUSTER", na=False)].index[0])
+    table_end_row = engine.find_table_end_row(df_sheet, header_row_idx, rto_cluster_col_idx, len(df_sheet))
+    data_rows = df_sheet.iloc[header_row_idx + 1:table_end_row]
+    repeats = max(1, round(target_cells / max(1, data_rows.size)))
+    table_rows = pd.concat([data_rows] * repeats, ignore_index=True)
+    if clustered:
+        row_costs = [estimated_row_cost(row_values) for row_values in table_rows.itertuples(index=False)]
+        table_rows = table_rows.iloc[sorted(range(len(row_costs)), key=row_costs.__getitem__)]
+    tiled = pd.concat([df_sheet.iloc[:header_row_idx + 1], table_rows, df_sheet.iloc[table_end_row:]], ignore_index=True)
+    return tiled, xls.sheet_names[0], header_row_idx, rto_cluster_col_idx, len(table_rows)
+
+
+def measure_row_seconds(df_sheet, header_row_idx, rto_cluster_col_idx, table_rows, repeats=3):
+    # Serial parse time of every row of the (single) first table, best of repeats.
+    header_plan = engine.build_header_plan(df_sheet, header_row_idx, range(rto_cluster_col_idx + 1, df_sheet.shape[1]), None, "bench")
+    row_entries = engine.table_row_entries(df_sheet, header_row_idx, rto_cluster_col_idx, header_row_idx + 1 + table_rows, header_plan)
+    row_seconds = [float("inf")] * len(row_entries)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeats):
+            for row_idx, row_entry in enumerate(row_entries):
+                engine.SEGMENT_FACTS_CACHE.clear()
+                engine.CELL_ANALYSIS_CACHE.clear()
+                started = time.perf_counter()
+                for _ in engine.iter_row_entry_rows([row_entry], header_plan, None, 1, defaultdict(int)): pass
+                row_seconds[row_idx] = min(row_seconds[row_idx], time.perf_counter() - started)
+    return row_seconds
+
+
+def timed_run(df_sheet, sheet_name, workers, partition="rows", chunks_per_worker=DEFAULT_CHUNKS_PER_WORKER):
+    engine.PARALLEL_TABLE_WORKERS = workers
+    engine.PARALLEL_TABLE_MIN_CELLS = 0
+    engine.PARALLEL_TABLE_PARTITION = partition
+    engine.PARALLEL_TABLE_CHUNKS_PER_WORKER = chunks_per_worker
+    engine.LAST_PARALLEL_TABLE_STATS = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        rows = engine.process_sheet(df_sheet, sheet_name)
+        elapsed = time.perf_counter() - started
+    return elapsed, [row.values for row in rows], engine.LAST_PARALLEL_TABLE_STATS
+
+
+def run_layout(grid_path, target_cells, max_workers, clustered):
+    df_sheet, sheet_name, header_row_idx, rto_cluster_col_idx, table_rows = load_tiled_sheet(grid_path, target_cells, clustered)
+    layout = "clustered" if clustered else "tiled"
+    print(f"{os.path.basename(grid_path)} ({layout}): first table {table_rows} rows ({df_sheet.shape[1]} columns), {os.cpu_count()} CPUs")
+
+    row_seconds = measure_row_seconds(df_sheet, header_row_idx, rto_cluster_col_idx, table_rows)
+    timed_run(df_sheet, sheet_name, 0)  # warm the per-text caches and regexes
+    serial_seconds, serial_rows, _ = timed_run(df_sheet, sheet_name, 0)
+    print(f"  serial                 {serial_seconds:8.2f}s  {len(serial_rows)} rows")
+    workers = 2
+    while workers <= max(2, max_workers):
+        for chunks_per_worker in sorted({1, DEFAULT_CHUNKS_PER_WORKER}):
+            for partition in PARTITIONS:
+                elapsed, rows, stats = timed_run(df_sheet, sheet_name, workers, partition, chunks_per_worker)
+                speedup = serial_seconds / elapsed
+                status = "same rows" if rows == serial_rows else "ROWS DIFFER"
+                print(f"  {workers:2d} workers x{chunks_per_worker} {partition:>5}  {elapsed:8.2f}s  speedup {speedup:5.2f}x  efficiency {speedup / workers:6.1%}  "
+                      f"projected {projected_efficiency(row_seconds, stats['row_ranges'], workers):6.1%}  {status}")
+        workers *= 2
+
+
+def main():
+    grid_path = sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] else DEFAULT_GRID
+    target_cells = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_TARGET_CELLS
+    max_workers = int(sys.argv[3]) if len(sys.argv) > 3 else (os.cpu_count() or 1)
+    for clustered in (False, True):
+        run_layout(grid_path, target_cells, max_workers, clustered)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import os
+import sys
+import time
+import argparse
+
+import iciciparser17 as engine
+
+# Month-over-month payout diff between two processed outputs or two grids.
+#
+#   python icicidiff.py <old> <new> [--output diff.xlsx|diff.csv]
+#
+# Rows are keyed on every OUTPUT_COLUMNS field except the payout itself
+# (po_percent), its remark and slab_month, and compared with pandas merges (hash
+# joins) over integer key ids, so 100k+ row months diff in seconds:
+#   1. rows identical on key, po_percent and remark on both sides are unchanged;
+#   2. the rest is joined on key: matched rows are "changed" (old and new values
+#      side by side), the leftovers "removed" (old only) or "added" (new only).
+# A key can legitimately repeat within a month (one cell emitting several
+# payouts, the same header vehicle in two columns), so repeats are paired in
+# order of appearance at both steps.
+DIFF_VALUE_COLUMNS = ["po_percent", "remark"]
+DIFF_IGNORED_COLUMNS = DIFF_VALUE_COLUMNS + ["slab_month"]
+DIFF_KEY_COLUMNS = [col for col in engine.OUTPUT_COLUMNS if col not in DIFF_IGNORED_COLUMNS]
+DIFF_REPORT_COLUMNS = (["change"] + DIFF_KEY_COLUMNS +
+                       ["old_po_percent", "new_po_percent", "old_remark", "new_remark", "old_slab_month", "new_slab_month"])
+DIFF_MERGE_CHANGES = {"left_only": "removed", "both": "changed", "right_only": "added"}
+DIFF_CHANGE_ORDER = {"removed": 0, "changed": 1, "added": 2}
+PROCESSED_OUTPUT_EXTENSIONS = (".csv", ".parquet")
+
+
+def normalize_output_frame(output_df):
+    # Every output column as plain strings, "" for missing, so frames read back
+    # from a file compare equal to frames built straight from a grid.
+    pd = engine.pd
+    columns = {}
+    for col in engine.OUTPUT_COLUMNS:
+        if col not in output_df.columns:
+            columns[col] = pd.Series([""] * len(output_df), dtype=object)
+            continue
+        column = output_df[col].astype(object)
+        columns[col] = column.where(column.notna(), "").astype(str).reset_index(drop=True)
+    return pd.DataFrame(columns, columns=engine.OUTPUT_COLUMNS)
+
+
+def is_processed_output(path):
+    if os.path.splitext(path)[1].lower() in PROCESSED_OUTPUT_EXTENSIONS:
+        return True
+    header = engine.pd.read_excel(path, nrows=0)
+    return set(engine.OUTPUT_COLUMNS) <= set(header.columns)
+
+
+def load_output_frame(path):
+    # A processed output (.xlsx/.csv/.parquet with the OUTPUT_COLUMNS header) is
+    # read as is; anything else is parsed as a grid first.
+    pd = engine.pd
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        output_df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    elif extension == ".parquet":
+        output_df = pd.read_parquet(path)
+    elif is_processed_output(path):
+        output_df = pd.read_excel(path, dtype=str, keep_default_na=False)
+    else:
+        print(f"INFO: diff: {os.path.basename(path)} is a grid, parsing it first.")
+        output_df = engine.build_output_frame(engine.iter_rows(path))
+    return normalize_output_frame(output_df)
+
+
+def pad_output_frame(output_df):
+    # A trailing all-empty row, so iloc[-1] stands for "no row on this side".
+    pd = engine.pd
+    padding = pd.DataFrame([[None] * len(engine.OUTPUT_COLUMNS)], columns=engine.OUTPUT_COLUMNS)
+    return pd.concat([output_df, padding], ignore_index=True)
+
+
+def diff_output_frames(old_df, new_df):
+    # Returns (report frame in DIFF_REPORT_COLUMNS, unchanged row count). Report
+    # rows run removed, changed, added, each in the order of their output; a
+    # change that keeps po_percent and only rewords the remark is "remark changed".
+    pd = engine.pd
+    old_df = normalize_output_frame(old_df)
+    new_df = normalize_output_frame(new_df)
+
+    # One integer id per distinct key (and per key + values) across both sides,
+    # so the joins below hash single int64 columns instead of 17 strings.
+    both = pd.concat([old_df, new_df], ignore_index=True)
+    key_ids = both.groupby(DIFF_KEY_COLUMNS, sort=False).ngroup().to_numpy()
+    value_ids = both.groupby(DIFF_KEY_COLUMNS + DIFF_VALUE_COLUMNS, sort=False).ngroup().to_numpy()
+    old_ids = pd.DataFrame({"key_id": key_ids[:len(old_df)], "value_id": value_ids[:len(old_df)], "old_row": range(len(old_df))})
+    new_ids = pd.DataFrame({"key_id": key_ids[len(old_df):], "value_id": value_ids[len(old_df):], "new_row": range(len(new_df))})
+
+    # 1. Identical rows, paired occurrence by occurrence.
+    old_ids["occurrence"] = old_ids.groupby("value_id", sort=False).cumcount()
+    new_ids["occurrence"] = new_ids.groupby("value_id", sort=False).cumcount()
+    unchanged = old_ids.merge(new_ids, on=["value_id", "occurrence"], how="inner")
+    old_rest = old_ids[~old_ids["old_row"].isin(unchanged["old_row"])].drop(columns=["value_id", "occurrence"])
+    new_rest = new_ids[~new_ids["new_row"].isin(unchanged["new_row"])].drop(columns=["value_id", "occurrence"])
+
+    # 2. Same key, different payout or remark.
+    old_rest["occurrence"] = old_rest.groupby("key_id", sort=False).cumcount()
+    new_rest["occurrence"] = new_rest.groupby("key_id", sort=False).cumcount()
+    joined = old_rest.merge(new_rest, on=["key_id", "occurrence"], how="outer", indicator=True)
+    joined["change"] = joined["_merge"].map(DIFF_MERGE_CHANGES).astype(object)
+    joined["change_rank"] = joined["change"].map(DIFF_CHANGE_ORDER)
+    joined = joined.sort_values(["change_rank", "old_row", "new_row"], kind="stable")
+
+    # Position -1 picks the padding row of the side a row is missing from.
+    old_rows = joined["old_row"].fillna(-1).astype("int64").to_numpy()
+    new_rows = joined["new_row"].fillna(-1).astype("int64").to_numpy()
+    old_side = pad_output_frame(old_df).iloc[old_rows].reset_index(drop=True)
+    new_side = pad_output_frame(new_df).iloc[new_rows].reset_index(drop=True)
+    report = old_side[DIFF_KEY_COLUMNS].combine_first(new_side[DIFF_KEY_COLUMNS])
+    report["change"] = joined["change"].to_numpy()
+    for col in DIFF_VALUE_COLUMNS + ["slab_month"]:
+        report[f"old_{col}"] = old_side[col]
+        report[f"new_{col}"] = new_side[col]
+    changed = report["change"] == "changed"
+    same_payout = changed & (report["old_po_percent"] == report["new_po_percent"])
+    report.loc[same_payout, "change"] = "remark changed"
+    return report[DIFF_REPORT_COLUMNS], len(unchanged)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Report payouts added, removed or changed between two months.")
+    arg_parser.add_argument("old", help="Earlier processed output (.xlsx/.csv/.parquet) or grid workbook.")
+    arg_parser.add_argument("new", help="Later processed output or grid workbook.")
+    arg_parser.add_argument("--output", help="Diff report to write (.xlsx or .csv; default: diff_<old>_vs_<new>.xlsx).")
+    args = arg_parser.parse_args(argv)
+
+    for path in (args.old, args.new):
+        if not os.path.exists(path):
+            print(f"Error: File not found at {path}")
+            sys.exit(1)
+    started = time.perf_counter()
+    old_df = load_output_frame(args.old)
+    new_df = load_output_frame(args.new)
+    loaded = time.perf_counter()
+    report, unchanged_count = diff_output_frames(old_df, new_df)
+    print(f"INFO: diff: {len(old_df)} old rows, {len(new_df)} new rows compared in {time.perf_counter() - loaded:.2f}s "
+          f"(loading took {loaded - started:.2f}s)")
+    change_counts = report["change"].value_counts()
+    print(f"INFO: diff: unchanged={unchanged_count}, " + ", ".join(
+        f"{change}={change_counts.get(change, 0)}" for change in ("changed", "remark changed", "removed", "added")))
+
+    output_path = args.output or "diff_{}_vs_{}.xlsx".format(*(os.path.splitext(os.path.basename(path))[0] for path in (args.old, args.new)))
+    if os.path.splitext(output_path)[1].lower() == ".csv":
+        report.to_csv(output_path, index=False)
+    else:
+        report.to_excel(output_path, index=False)
+    print(f"Diff report saved to: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
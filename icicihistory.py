@@ -0,0 +1,209 @@
+import os
+import sys
+import csv
+import time
+import sqlite3
+import datetime
+import argparse
+
+import iciciparser17 as engine
+import icicidiff
+
+# Append-only payout history across grids, with a validity interval per payout.
+#
+#   python icicihistory.py ingest <grid or processed output>... [--db PATH]
+#   python icicihistory.py as-of <date|Mar25> [--cluster X] [--veh-type GCV] ... [--output out.csv]
+#   python icicihistory.py range <start> <end> [filters] [--output out.csv]
+#
+# A payout key is the icicidiff key (every OUTPUT_COLUMNS field except
+# po_percent, remark and slab_month) plus its occurrence number, as keys repeat
+# within a month. Each payout_intervals row says "this key paid po_percent (with
+# this remark) from valid_from until valid_to" (exclusive; OPEN_VALID_TO while it
+# is current). Ingesting a month effective from date D, in one transaction:
+#   - an open interval whose key carries the same payout in the month stays open;
+#   - any other open interval is closed at D (payout changed or key gone);
+#   - keys without an open interval left get a new interval opened at D.
+# Rows are never deleted or rewritten beyond closing valid_to. Months must be
+# ingested in date order; a re-issue of the latest month (april 25 2nd after
+# april 25) supersedes it: intervals the earlier issue opened are closed at the
+# same date, leaving zero-length intervals that no as-of query returns. A file
+# whose content was already ingested is skipped.
+#
+# SQLite (already behind --sqlite-db and the dedup spill) rather than a columnar
+# file, since ingest updates intervals in place and queries need indexes: as-of
+# and range queries for a combination go through the key lookup index and then
+# (key_id, valid_from); unfiltered ones through (valid_from, valid_to).
+HISTORY_DB_FILENAME = "icici_history.sqlite"
+OPEN_VALID_TO = "9999-12-31"
+HISTORY_KEY_COLUMNS = icicidiff.DIFF_KEY_COLUMNS + ["occurrence"]
+HISTORY_FILTER_COLUMNS = ["cluster_code", "veh_type", "vehicle", "bike_make", "fuel_type", "age", "gvw"]
+HISTORY_QUERY_COLUMNS = icicidiff.DIFF_KEY_COLUMNS + ["po_percent", "remark", "valid_from", "valid_to", "run_id"]
+HISTORY_SCHEMA = [
+    f"""CREATE TABLE IF NOT EXISTS history_keys (key_id INTEGER PRIMARY KEY,
+        {', '.join(f'{col} TEXT NOT NULL' for col in icicidiff.DIFF_KEY_COLUMNS)}, occurrence INTEGER NOT NULL,
+        UNIQUE ({', '.join(HISTORY_KEY_COLUMNS)}))""",
+    "CREATE INDEX IF NOT EXISTS history_keys_lookup ON history_keys (cluster_code, veh_type, vehicle, bike_make)",
+    """CREATE TABLE IF NOT EXISTS payout_intervals (key_id INTEGER NOT NULL REFERENCES history_keys (key_id),
+        po_percent TEXT NOT NULL, remark TEXT NOT NULL, valid_from TEXT NOT NULL, valid_to TEXT NOT NULL, run_id TEXT NOT NULL)""",
+    "CREATE INDEX IF NOT EXISTS payout_intervals_key ON payout_intervals (key_id, valid_from)",
+    "CREATE INDEX IF NOT EXISTS payout_intervals_time ON payout_intervals (valid_from, valid_to)",
+    f"CREATE INDEX IF NOT EXISTS payout_intervals_open ON payout_intervals (key_id) WHERE valid_to = '{OPEN_VALID_TO}'",
+    """CREATE TABLE IF NOT EXISTS history_runs (run_id TEXT PRIMARY KEY, source_file TEXT, slab_month TEXT,
+        valid_from TEXT, ingested_at TEXT, row_count INTEGER, opened INTEGER, closed INTEGER, unchanged INTEGER)""",
+]
+
+
+def parse_history_date(text):
+    # "2025-03-15" or a slab month ("Mar25", "MAR'25", "Mar2025") meaning its first day.
+    for date_format in ("%Y-%m-%d", "%b%y", "%b%Y"):
+        try:
+            return datetime.datetime.strptime(text.replace("'", "").replace(" ", ""), date_format).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def open_history_db(db_path):
+    connection = sqlite3.connect(db_path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    with connection:
+        for statement in HISTORY_SCHEMA:
+            connection.execute(statement)
+    return connection
+
+
+def ingest_month(connection, path, valid_from=None):
+    # Returns the history_runs entry written for the file, or None if skipped.
+    run_id = engine.file_content_hash(path)
+    if connection.execute("SELECT 1 FROM history_runs WHERE run_id = ?", (run_id,)).fetchone():
+        print(f"INFO: history: Skipping {os.path.basename(path)}: same content already ingested.")
+        return None
+    month_df = icicidiff.load_output_frame(path)
+    slab_months = sorted(set(month_df["slab_month"]) - {""})
+    slab_month = ",".join(slab_months)
+    if valid_from is None:
+        if len(slab_months) != 1 or parse_history_date(slab_months[0]) is None:
+            raise ValueError(f"{os.path.basename(path)}: cannot date slab month(s) {slab_months or 'none'}; pass --valid-from")
+        valid_from = parse_history_date(slab_months[0])
+    latest = connection.execute("SELECT MAX(valid_from) FROM history_runs").fetchone()[0]
+    if latest is not None and valid_from < latest:
+        raise ValueError(f"{os.path.basename(path)}: effective {valid_from} is before the latest ingested month ({latest}); ingest months in date order")
+
+    month_df["occurrence"] = month_df.groupby(icicidiff.DIFF_KEY_COLUMNS, sort=False).cumcount()
+    incoming_columns = HISTORY_KEY_COLUMNS + icicidiff.DIFF_VALUE_COLUMNS
+    key_columns = ", ".join(HISTORY_KEY_COLUMNS)
+    started = time.perf_counter()
+    with connection:
+        connection.execute(f"CREATE TEMP TABLE incoming ({', '.join(incoming_columns)})")
+        connection.executemany(f"INSERT INTO incoming VALUES ({', '.join('?' * len(incoming_columns))})",
+                               month_df[incoming_columns].itertuples(index=False, name=None))
+        connection.execute(f"INSERT OR IGNORE INTO history_keys ({key_columns}) SELECT {key_columns} FROM incoming")
+        connection.execute(f"""CREATE TEMP TABLE incoming_payouts AS
+            SELECT k.key_id, i.po_percent, i.remark FROM incoming i JOIN history_keys k USING ({key_columns})""")
+        connection.execute("CREATE INDEX temp.incoming_payouts_key ON incoming_payouts (key_id)")
+        # OPEN_VALID_TO is spelled out (not bound) so both statements use the
+        # partial index over open intervals.
+        closed = connection.execute(f"""UPDATE payout_intervals SET valid_to = ?
+            WHERE valid_to = '{OPEN_VALID_TO}' AND NOT EXISTS (SELECT 1 FROM incoming_payouts n WHERE n.key_id = payout_intervals.key_id
+                AND n.po_percent = payout_intervals.po_percent AND n.remark = payout_intervals.remark)""",
+                                    (valid_from,)).rowcount
+        opened = connection.execute(f"""INSERT INTO payout_intervals (key_id, po_percent, remark, valid_from, valid_to, run_id)
+            SELECT n.key_id, n.po_percent, n.remark, ?, '{OPEN_VALID_TO}', ? FROM incoming_payouts n
+            WHERE NOT EXISTS (SELECT 1 FROM payout_intervals p WHERE p.key_id = n.key_id AND p.valid_to = '{OPEN_VALID_TO}')""",
+                                    (valid_from, run_id)).rowcount
+        run_entry = {"run_id": run_id, "source_file": os.path.abspath(path), "slab_month": slab_month, "valid_from": valid_from,
+                     "ingested_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+                     "row_count": len(month_df), "opened": opened, "closed": closed, "unchanged": len(month_df) - opened}
+        connection.execute(f"INSERT INTO history_runs ({', '.join(run_entry)}) VALUES ({', '.join('?' * len(run_entry))})",
+                           tuple(run_entry.values()))
+        connection.execute("DROP TABLE temp.incoming")
+        connection.execute("DROP TABLE temp.incoming_payouts")
+    print(f"INFO: history: {os.path.basename(path)} ({slab_month}, from {valid_from}): {len(month_df)} rows, "
+          f"{opened} intervals opened, {closed} closed, {run_entry['unchanged']} unchanged in {time.perf_counter() - started:.2f}s")
+    return run_entry
+
+
+def query_intervals(connection, start, end, filters=None):
+    # Intervals overlapping [start, end); an as-of query is start = date and
+    # end = the next day. filters: {key column: value}. Zero-length intervals
+    # (superseded by a re-issue) never match.
+    conditions = ["p.valid_from < ?", "p.valid_to > ?", "p.valid_to > p.valid_from"]
+    params = [end, start]
+    for col, value in (filters or {}).items():
+        conditions.append(f"k.{col} = ?")
+        params.append(value)
+    select_columns = ", ".join(f"k.{col}" for col in icicidiff.DIFF_KEY_COLUMNS)
+    return connection.execute(f"""SELECT {select_columns}, p.po_percent, p.remark, p.valid_from,
+            CASE p.valid_to WHEN '{OPEN_VALID_TO}' THEN '' ELSE p.valid_to END, p.run_id
+        FROM payout_intervals p JOIN history_keys k ON k.key_id = p.key_id
+        WHERE {' AND '.join(conditions)} ORDER BY p.key_id, p.valid_from""", params).fetchall()
+
+
+def next_day(date_text):
+    return (datetime.date.fromisoformat(date_text) + datetime.timedelta(days=1)).isoformat()
+
+
+def write_query_rows(rows, output_path=None):
+    if output_path:
+        with open(output_path, "w", newline="", encoding="utf-8") as out_file:
+            writer = csv.writer(out_file)
+            writer.writerow(HISTORY_QUERY_COLUMNS)
+            writer.writerows(rows)
+        print(f"INFO: history: {len(rows)} intervals written to {output_path}")
+        return
+    writer = csv.writer(sys.stdout)
+    writer.writerow(HISTORY_QUERY_COLUMNS)
+    writer.writerows(rows)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Keep a dated history of ICICI CV payouts and query it as of any date.")
+    arg_parser.add_argument("--db", default=HISTORY_DB_FILENAME, help=f"History database (default: {HISTORY_DB_FILENAME}).")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    ingest_parser = commands.add_parser("ingest", help="Add months (grids or processed outputs, oldest first) to the history.")
+    ingest_parser.add_argument("paths", nargs="+")
+    ingest_parser.add_argument("--valid-from", help="Effective date (YYYY-MM-DD or Mar25) for every path, instead of their slab_month.")
+    as_of_parser = commands.add_parser("as-of", help="Payouts in force on a date.")
+    as_of_parser.add_argument("date", help="YYYY-MM-DD, or a slab month (Mar25) for its first day.")
+    range_parser = commands.add_parser("range", help="Payout intervals overlapping [start, end).")
+    range_parser.add_argument("start")
+    range_parser.add_argument("end")
+    for query_parser in (as_of_parser, range_parser):
+        for col in HISTORY_FILTER_COLUMNS:
+            query_parser.add_argument(f"--{col.replace('_', '-')}", dest=col, help=f"Only rows with this {col}.")
+        query_parser.add_argument("--output", help="Write the rows to this CSV instead of stdout.")
+    args = arg_parser.parse_args(argv)
+
+    connection = open_history_db(args.db)
+    try:
+        if args.command == "ingest":
+            valid_from = None
+            if args.valid_from:
+                valid_from = parse_history_date(args.valid_from)
+                if valid_from is None: arg_parser.error(f"--valid-from: cannot read date {args.valid_from!r}")
+            for path in args.paths:
+                if not os.path.exists(path):
+                    print(f"Error: File not found at {path}")
+                    sys.exit(1)
+                try:
+                    ingest_month(connection, path, valid_from)
+                except ValueError as e:
+                    print(f"Error: {e}")
+                    sys.exit(1)
+            return
+        dates = [args.date] if args.command == "as-of" else [args.start, args.end]
+        parsed_dates = [parse_history_date(date_text) for date_text in dates]
+        if None in parsed_dates: arg_parser.error(f"cannot read date(s) {dates}")
+        start, end = (parsed_dates[0], next_day(parsed_dates[0])) if args.command == "as-of" else parsed_dates
+        filters = {col: getattr(args, col) for col in HISTORY_FILTER_COLUMNS if getattr(args, col) is not None}
+        started = time.perf_counter()
+        rows = query_intervals(connection, start, end, filters)
+        print(f"INFO: history: {len(rows)} intervals in {(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+        write_query_rows(rows, args.output)
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
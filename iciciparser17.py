@@ -1,7 +1,42 @@
-import pandas as pd
 import re
 import os
+import csv
+import math
+import numbers
+import hashlib
+import json
+import pickle
+import sqlite3
+import shutil
+import tempfile
+import time
+import tracemalloc
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from array import array
 from collections import defaultdict
+import bisect
+import itertools
+import importlib
+
+
+class LazyModule:
+    # Stands in for a heavy module (pandas pulls in numpy, openpyxl readers, ...)
+    # until first use, then rebinds the module-level name to the real module, so
+    # --help and other runs that never touch a DataFrame skip the import and later
+    # lookups cost nothing extra.
+    def __init__(self, module_name, global_name):
+        self.module_name = module_name
+        self.global_name = global_name
+
+    def __getattr__(self, attr_name):
+        module = importlib.import_module(self.module_name)
+        globals()[self.global_name] = module
+        return getattr(module, attr_name)
+
+pd = LazyModule("pandas", "pd")
+np = LazyModule("numpy", "np")
 
 # --- Configuration ---
 OUTPUT_COLUMNS = [
@@ -11,102 +46,548 @@ OUTPUT_COLUMNS = [
     "seating_cap", "gvw"
 ]
 
-BIKE_MAKES_RAW = [
-    "TATA", "AL", "ASHOK LEYLAND", "M&M", "MAHINDRA", "EICHER", "MARUTI", "MARUTI SUZUKI", "MARUTI SUPER CARRY",
-    "PIAGGIO", "BAJAJ", "ATUL", "TVS", "TOYOTA", "FORCE MOTORS", "SML ISUZU",
-    "SWARAJ MAZDA", "HINDUSTAN MOTORS", "MAHINDRA NAVISTAR", "BHARATBENZ",
-    "SCANIA", "VOLVO"
-]
-BIKE_MAKES = sorted(list(set(bm.upper() for bm in BIKE_MAKES_RAW)), key=len, reverse=True)
-BIKE_MAKE_REGEX_STR = r"\b(" + "|".join(re.escape(bm) for bm in BIKE_MAKES) + r")\b"
+# Keyword lists live in icici_keywords.json next to this file (or the file named
+# by ICICI_KEYWORDS_CONFIG). They are normalized once into a versioned pickle
+# artifact beside the config holding the ordered keyword lists, the escaped
+# alternation sources and the lookup maps/sets; the artifact is rebuilt whenever
+# the config's SHA-256 changes. Compiled regexes cannot be persisted (a pickled
+# re.Pattern is recompiled on load), so only the sources are stored.
+KEYWORD_CONFIG_PATH = os.environ.get("ICICI_KEYWORDS_CONFIG") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "icici_keywords.json")
+KEYWORD_ARTIFACT_FORMAT_VERSION = 2
+
+def ordered_keywords(raw_keywords):
+    # Upper-cased, de-duplicated (first occurrence wins), longest first so the
+    # alternations prefer "MARUTI SUPER CARRY" over "MARUTI". Ties keep config order.
+    return sorted(dict.fromkeys(keyword.upper() for keyword in raw_keywords), key=len, reverse=True)
+
+def keyword_choices(keywords):
+    return "|".join(re.escape(keyword) for keyword in keywords)
+
+def keyword_alternation(keywords):
+    return r"\b(" + keyword_choices(keywords) + r")\b"
+
+def cluster_code_digits(cluster_code):
+    # A bare percentage equal to a cluster code with "RTO"/"RTOS" stripped (e.g.
+    # "TN10" in a TN10 row) is a label, not a payout.
+    return cluster_code.upper().replace("RTO","").strip().replace("RTOS","").strip()
+
+# Typo index (SymSpell-style): every fuzzy-matchable term and each of its deletions
+# up to the term's edit budget maps back to the term, so a lookup only generates
+# the query's own deletions and checks the few candidates they hit, independent of
+# vocabulary size. Only alphabetic terms of 5+ letters are fuzzy (1 edit, 2 from 9
+# letters); codes with digits ("TN10" vs "TN12") and short words must match exactly.
+TYPO_MIN_TERM_LENGTH = 5
+TYPO_TWO_EDIT_TERM_LENGTH = 9
+# Words that may sit next to a keyword inside a run-together token ("WB1ONLY").
+TYPO_CONNECTOR_WORDS = ("ONLY", "IN", "AND", "EXCEPT", "EXCLUDING")
+
+def compact_keyword(keyword):
+    return re.sub(r"[^A-Z0-9&]", "", keyword.upper())
+
+def typo_edit_budget(length):
+    if length < TYPO_MIN_TERM_LENGTH: return 0
+    return 2 if length >= TYPO_TWO_EDIT_TERM_LENGTH else 1
+
+def keyword_deletions(word, max_edits):
+    deletions = {word}
+    frontier = {word}
+    for _ in range(max_edits):
+        frontier = {candidate[:idx] + candidate[idx + 1:] for candidate in frontier for idx in range(len(candidate))}
+        deletions |= frontier
+    return deletions
+
+def build_typo_index(keywords):
+    # compact spelling -> configured spellings (first one is used for rewrites),
+    # in vocabulary order; deletions -> compact terms in the same order.
+    compact_terms = {}
+    for keyword in keywords:
+        compact_terms.setdefault(compact_keyword(keyword), []).append(keyword.upper())
+    deletions = defaultdict(list)
+    for compact_term in compact_terms:
+        if compact_term.isalpha():
+            for deletion in keyword_deletions(compact_term, typo_edit_budget(len(compact_term))):
+                deletions[deletion].append(compact_term)
+    return ({compact_term: tuple(spellings) for compact_term, spellings in compact_terms.items()},
+            {deletion: tuple(terms) for deletion, terms in deletions.items()})
+
+def build_keyword_artifact(config, config_hash):
+    bike_makes = ordered_keywords(config["bike_makes"])
+    special_cluster_codes = ordered_keywords(config["special_cluster_codes"])
+    specific_vehicles = ordered_keywords(config["specific_vehicles"])
+    fuel_types = ordered_keywords(config["fuel_types"])
+    vehicle_categories = dict(config["vehicle_categories"])
+    plan_types = dict(config["plan_types"])
+    typo_terms, typo_deletions = build_typo_index(bike_makes + special_cluster_codes + specific_vehicles + fuel_types
+                                                  + [key.upper() for key in vehicle_categories] + [key.upper() for key in plan_types])
+    return {
+        "format_version": KEYWORD_ARTIFACT_FORMAT_VERSION,
+        "config_hash": config_hash,
+        "raw": config,
+        "bike_makes": bike_makes,
+        "bike_make_regex_source": keyword_alternation(bike_makes),
+        "special_cluster_codes": special_cluster_codes,
+        "special_cluster_regex_source": keyword_alternation(special_cluster_codes),
+        "special_cluster_code_digits": frozenset(cluster_code_digits(scc) for scc in special_cluster_codes),
+        "vehicle_categories": vehicle_categories,
+        "vehicle_category_regex_source": keyword_alternation(vehicle_categories.keys()),
+        "specific_vehicles": specific_vehicles,
+        "specific_vehicle_set": frozenset(specific_vehicles),
+        "specific_vehicle_regex_source": keyword_alternation(specific_vehicles),
+        "fuel_types": fuel_types,
+        "fuel_type_regex_source": keyword_alternation(fuel_types),
+        "plan_types": plan_types,
+        "plan_type_regex_source": keyword_alternation(plan_types.keys()),
+        "typo_terms": typo_terms,
+        "typo_deletions": typo_deletions,
+        "typo_ignore": frozenset(word.upper() for word in config.get("fuzzy_ignore", [])),
+    }
+
+def load_keyword_artifact(config_path=KEYWORD_CONFIG_PATH):
+    with open(config_path, "rb") as config_file:
+        config_bytes = config_file.read()
+    config_hash = hashlib.sha256(config_bytes).hexdigest()
+    artifact_path = os.path.splitext(config_path)[0] + ".artifact.pickle"
+    try:
+        with open(artifact_path, "rb") as artifact_file:
+            artifact = pickle.load(artifact_file)
+        if artifact.get("format_version") == KEYWORD_ARTIFACT_FORMAT_VERSION and artifact.get("config_hash") == config_hash:
+            return artifact
+    except FileNotFoundError:
+        pass
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError) as e:
+        print(f"WARN: keywords: Ignoring unreadable artifact {artifact_path} ({e}).")
+
+    artifact = build_keyword_artifact(json.loads(config_bytes), config_hash)
+    try:
+        fd, temp_path = tempfile.mkstemp(prefix=".keywords_", suffix=".tmp", dir=os.path.dirname(artifact_path) or ".")
+        with os.fdopen(fd, "wb") as temp_file:
+            pickle.dump(artifact, temp_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, artifact_path)
+        print(f"INFO: keywords: Rebuilt {artifact_path} for config {config_hash[:12]}")
+    except OSError as e:
+        print(f"WARN: keywords: Could not write {artifact_path} ({e}). Using the config directly.")
+    return artifact
+
+KEYWORDS = load_keyword_artifact()
+
+BIKE_MAKES_RAW = KEYWORDS["raw"]["bike_makes"]
+BIKE_MAKES = KEYWORDS["bike_makes"]
+BIKE_MAKE_REGEX_STR = KEYWORDS["bike_make_regex_source"]
 BIKE_MAKE_REGEX = re.compile(BIKE_MAKE_REGEX_STR, re.IGNORECASE)
 
 
-SPECIAL_CLUSTER_CODES_RAW = [
-    "WB1", "DL", "NON DL RTO", "JK1 RTO", "GJ1 RTO", "UP1 EAST", "UK1 RTO", "UP EAST 1", "UP EAST1",
-    "KA1 RTOS", "KA1 RTO", "TN10", "TN12", "TN02", "TN22", "TN04", "TN06", "TN09",
-    "TN18", "TN19", "TN20", "TN11", "TN14",
-    "KA01-05", "OD1", "PIMPRI", "PIMPRICHINCHWAD", "PIMPRI CHINCHWAD",
-    "DELHI SURROUNDING RTO", "GJ1", "JK1"
-]
-SPECIAL_CLUSTER_CODES = sorted(list(set(scc.upper() for scc in SPECIAL_CLUSTER_CODES_RAW)), key=len, reverse=True)
+SPECIAL_CLUSTER_CODES_RAW = KEYWORDS["raw"]["special_cluster_codes"]
+SPECIAL_CLUSTER_CODES = KEYWORDS["special_cluster_codes"]
+SPECIAL_CLUSTER_CODE_DIGITS = KEYWORDS["special_cluster_code_digits"]
 # Exact match regex
-SPECIAL_CLUSTER_REGEX_EXACT_STR = r"\b(" + "|".join(re.escape(scc) for scc in SPECIAL_CLUSTER_CODES) + r")\b"
+SPECIAL_CLUSTER_REGEX_EXACT_STR = KEYWORDS["special_cluster_regex_source"]
 SPECIAL_CLUSTER_REGEX_EXACT = re.compile(SPECIAL_CLUSTER_REGEX_EXACT_STR, re.IGNORECASE)
 
 
-VEHICLE_CATEGORIES_MAP = {
-    "GCV": "GCV", "SCV": "GCV", "LCV": "GCV", "MHCV": "GCV",
-    "PCV": "PCV", "PCVTAXI": "PCV",
-    "MISC D CE": "MISC", "MIsc D CE": "MISC", "MIS D CE": "MISC", "MISC": "MISC"
-}
-VEHICLE_CATEGORY_REGEX_STR = r"\b(" + "|".join(re.escape(k) for k in VEHICLE_CATEGORIES_MAP.keys()) + r")\b"
+VEHICLE_CATEGORIES_MAP = KEYWORDS["vehicle_categories"]
+VEHICLE_CATEGORY_REGEX_STR = KEYWORDS["vehicle_category_regex_source"]
 VEHICLE_CATEGORY_REGEX = re.compile(VEHICLE_CATEGORY_REGEX_STR, re.IGNORECASE)
 TAXI_MATCH_REGEX = re.compile(r"\bTAXI\b", re.IGNORECASE)
 
 
-SPECIFIC_VEHICLES_RAW = [
-    "TANKER", "TIPPER", "TRUCK", "TRAILER", "DUMPER", "CRANES", "TRACTOR", "TRACTER",
-    "SCHOOL BUS", "STAFF BUS", "BUS", "TAXI", "CE", "BACKHOELOADER"
-]
-SPECIFIC_VEHICLES = sorted(list(set(sv.upper() for sv in SPECIFIC_VEHICLES_RAW)), key=len, reverse=True)
-SPECIFIC_VEHICLE_REGEX_STR = r"\b(" + "|".join(re.escape(sv) for sv in SPECIFIC_VEHICLES) + r")\b"
+SPECIFIC_VEHICLES_RAW = KEYWORDS["raw"]["specific_vehicles"]
+SPECIFIC_VEHICLES = KEYWORDS["specific_vehicles"]
+SPECIFIC_VEHICLE_SET = KEYWORDS["specific_vehicle_set"]
+SPECIFIC_VEHICLE_REGEX_STR = KEYWORDS["specific_vehicle_regex_source"]
 SPECIFIC_VEHICLE_REGEX = re.compile(SPECIFIC_VEHICLE_REGEX_STR, re.IGNORECASE)
 
 
-FUEL_TYPES_RAW = ["ELECTRIC", "PETROL", "CNG", "BIFUEL", "DIESEL"]
-FUEL_TYPES = sorted(list(set(ft.upper() for ft in FUEL_TYPES_RAW)), key=len, reverse=True)
-FUEL_TYPE_REGEX_STR = r"\b(" + "|".join(re.escape(ft) for ft in FUEL_TYPES) + r")\b"
+FUEL_TYPES_RAW = KEYWORDS["raw"]["fuel_types"]
+FUEL_TYPES = KEYWORDS["fuel_types"]
+FUEL_TYPE_REGEX_STR = KEYWORDS["fuel_type_regex_source"]
 FUEL_TYPE_REGEX = re.compile(FUEL_TYPE_REGEX_STR, re.IGNORECASE)
 
 
+KEYWORD_TOKEN_REGEX = re.compile(r"[A-Z0-9&]+")
+
+def edit_distance_within(word, term, max_edits):
+    # Optimal string alignment distance (adjacent transpositions count as one
+    # edit), or None once it must exceed max_edits.
+    if abs(len(word) - len(term)) > max_edits: return None
+    previous_row, current_row = None, list(range(len(term) + 1))
+    for i in range(1, len(word) + 1):
+        before_previous_row, previous_row = previous_row, current_row
+        current_row = [i] + [0] * len(term)
+        for j in range(1, len(term) + 1):
+            cost = 0 if word[i - 1] == term[j - 1] else 1
+            current_row[j] = min(previous_row[j] + 1, current_row[j - 1] + 1, previous_row[j - 1] + cost)
+            if i > 1 and j > 1 and word[i - 1] == term[j - 2] and word[i - 2] == term[j - 1]:
+                current_row[j] = min(current_row[j], before_previous_row[j - 2] + 1)
+        if min(current_row) > max_edits: return None
+    return current_row[-1] if current_row[-1] <= max_edits else None
+
+class KeywordTypoCorrector:
+    # Rewrites misspelled or run-together keyword tokens in an upper-cased text to
+    # a configured spelling ("TRACTR" -> "TRACTOR", "WB1ONLY" -> "WB1 ONLY",
+    # "SCHOOLBUS" -> "SCHOOL BUS", "PCVTAXI_ELECTRIC" -> "PCVTAXI ELECTRIC").
+    # Tokens or 2-3 token runs already spelled as configured, numbers and words in
+    # the config's fuzzy_ignore list are left alone; equally close candidates go
+    # to the one listed first. Used on the texts the parsers match against, never
+    # on remark text.
+    MAX_NGRAM = 3
+
+    def __init__(self, typo_terms, typo_deletions, ignore_words=(), max_cache_size=50000):
+        self.typo_terms = typo_terms
+        self.typo_deletions = typo_deletions
+        self.ignore_words = frozenset(ignore_words) | frozenset(TYPO_CONNECTOR_WORDS)
+        self.term_order = {compact_term: idx for idx, compact_term in enumerate(typo_terms)}
+        self.segment_words = set(typo_terms) | set(TYPO_CONNECTOR_WORDS)
+        self.cache = {}
+        self.max_cache_size = max_cache_size
+
+    def correct(self, text_upper):
+        try:
+            return self.cache[text_upper]
+        except KeyError:
+            pass
+        corrected = self.correct_uncached(text_upper)
+        if len(self.cache) >= self.max_cache_size:
+            self.cache.clear()
+        self.cache[text_upper] = corrected
+        return corrected
+
+    def correct_uncached(self, text_upper):
+        # "_" is a regex word character, so "PCVTAXI_ELECTRIC" hides both keywords from \b.
+        if "_" in text_upper: text_upper = text_upper.replace("_", " ")
+        tokens = [(match.start(), match.end(), match.group()) for match in KEYWORD_TOKEN_REGEX.finditer(text_upper)]
+        replacements = []
+        token_idx = 0
+        while token_idx < len(tokens):
+            ngram_hit = None
+            for ngram_size in range(min(self.MAX_NGRAM, len(tokens) - token_idx), 0, -1):
+                compact = "".join(token for _, _, token in tokens[token_idx:token_idx + ngram_size])
+                spellings = self.typo_terms.get(compact)
+                if spellings is None and ngram_size == 2 and compact.isalpha():
+                    # "ASHOK LEYLND": a misspelled multi-word keyword
+                    fuzzy_term = self.closest_compact_term(compact)
+                    if fuzzy_term is not None and " " in self.typo_terms[fuzzy_term][0]:
+                        spellings = self.typo_terms[fuzzy_term]
+                if spellings is not None:
+                    ngram_hit = (ngram_size, spellings)
+                    break
+            if ngram_hit is not None:
+                ngram_size, spellings = ngram_hit
+                start, end = tokens[token_idx][0], tokens[token_idx + ngram_size - 1][1]
+                if text_upper[start:end] not in spellings:
+                    replacements.append((start, end, spellings[0]))
+                token_idx += ngram_size
+                continue
+            start, end, token = tokens[token_idx]
+            fixed = self.fix_token(token)
+            if fixed is not None:
+                replacements.append((start, end, fixed))
+            token_idx += 1
+        if not replacements:
+            return text_upper
+        pieces, last_end = [], 0
+        for start, end, replacement in replacements:
+            pieces.append(text_upper[last_end:start])
+            pieces.append(replacement)
+            last_end = end
+        pieces.append(text_upper[last_end:])
+        return "".join(pieces)
+
+    def fix_token(self, token):
+        if token.isdigit() or token in self.ignore_words: return None
+        segmented = self.segment(token)
+        if segmented is not None: return segmented
+        if not token.isalpha(): return None
+        compact_term = self.closest_compact_term(token)
+        return self.typo_terms[compact_term][0] if compact_term is not None else None
+
+    def closest_compact_term(self, token):
+        max_edits = typo_edit_budget(len(token))
+        if not max_edits and len(token) >= TYPO_MIN_TERM_LENGTH - 1:
+            max_edits = 1  # a 4-letter token can be a 5-letter keyword missing a letter
+        if not max_edits: return None
+        candidates = set()
+        for deletion in keyword_deletions(token, max_edits):
+            candidates.update(self.typo_deletions.get(deletion, ()))
+        best = None
+        for compact_term in candidates:
+            distance = edit_distance_within(token, compact_term, typo_edit_budget(len(compact_term)))
+            if distance is None: continue
+            rank = (distance, self.term_order[compact_term])
+            if best is None or rank < best[0]:
+                best = (rank, compact_term)
+        return best[1] if best is not None else None
+
+    def segment(self, token):
+        # Longest-first word break into keywords and connector words. Pieces under
+        # 3 characters are only taken as "<code>ONLY"-style run-togethers.
+        pieces = self.segment_from(token, 0)
+        if pieces is None or len(pieces) < 2: return None
+        if not any(piece in self.typo_terms for piece in pieces): return None
+        if any(len(piece) < 3 for piece in pieces) and not (len(pieces) == 2 and pieces[1] == "ONLY"): return None
+        return " ".join(self.typo_terms[piece][0] if piece in self.typo_terms else piece for piece in pieces)
+
+    def segment_from(self, token, start):
+        if start == len(token): return []
+        for end in range(len(token), start, -1):
+            piece = token[start:end]
+            if piece in self.segment_words:
+                rest = self.segment_from(token, end)
+                if rest is not None:
+                    return [piece] + rest
+        return None
+
+KEYWORD_TYPO_CORRECTOR = KeywordTypoCorrector(KEYWORDS["typo_terms"], KEYWORDS["typo_deletions"], KEYWORDS["typo_ignore"])
+
+def keyword_match_text(text_upper):
+    return KEYWORD_TYPO_CORRECTOR.correct(text_upper)
+
+
+# Attribute families are tables of (pattern, normalizer) tried in list order; the
+# first pattern that matches anywhere in the text wins. A normalizer is either a
+# fixed value or a function of (matched_text, pattern_groups).
+def _normalize_age_years(text, groups):
+    return text.upper().replace("AGE","YRS").replace("YEARS","YRS").replace("YEAR","YRS").replace(" ","")
+
+def _normalize_age_above(text, groups):
+    return _normalize_age_years(text, groups).replace("ABOVE",">")
+
+def _normalize_upper(text, groups):
+    return text.upper()
+
+def _normalize_upper_no_spaces(text, groups):
+    return text.upper().replace(" ","")
+
+def _normalize_joined_groups(text, groups):
+    return "".join(g.strip() for g in groups if g).upper()
+
+def _normalize_sign_and_number(text, groups):
+    return f"{groups[0]}{groups[1]}".replace(" ","")
+
+def _normalize_first_group_no_spaces(text, groups):
+    return groups[0].replace(" ","")
+
 AGE_KEYWORD_PATTERNS = [
-    (re.compile(r"\bNEW\b", re.IGNORECASE), "NEW"),
-    (re.compile(r"\bOLD\b", re.IGNORECASE), "OLD"),
-    (re.compile(r"\b(\d+\s*-\s*\d+\s*(?:YRS?|YEARS?|AGE))\b", re.IGNORECASE), lambda m: m.group(1).upper().replace("AGE","YRS").replace("YEARS","YRS").replace("YEAR","YRS").replace(" ","")),
-    (re.compile(r"([<>]=?\s*\d+\s*(?:YRS?|YEARS?|AGE))\b", re.IGNORECASE), lambda m: m.group(1).upper().replace("AGE","YRS").replace("YEARS","YRS").replace("YEAR","YRS").replace(" ","")),
-    (re.compile(r"\b(ABOVE\s*\d+\s*(?:YRS?|YEARS?|AGE))\b", re.IGNORECASE), lambda m: m.group(1).upper().replace("AGE","YRS").replace("YEARS","YRS").replace("YEAR","YRS").replace(" ","").replace("ABOVE",">")),
-    (re.compile(r"\b(UPTO\s*\d+\s*(?:YRS?|YEARS?|AGE))\b", re.IGNORECASE), lambda m: m.group(0).upper().replace("AGE","YRS").replace("YEARS","YRS").replace("YEAR","YRS").replace(" ","")),
-    (re.compile(r"\b(\d+\s*\+\s*(?:YRS?|YEARS?|AGE))\b", re.IGNORECASE), lambda m: m.group(0).upper().replace("AGE","YRS").replace("YEARS","YRS").replace("YEAR","YRS").replace(" ","")),
-    (re.compile(r"\b(\d+(?:ST|ND|RD|TH)\s*YEAR)\b", re.IGNORECASE), lambda m: m.group(1).upper()),
+    (r"\bNEW\b", "NEW"),
+    (r"\bOLD\b", "OLD"),
+    (r"\b(\d+\s*-\s*\d+\s*(?:YRS?|YEARS?|AGE))\b", _normalize_age_years),
+    (r"([<>]=?\s*\d+\s*(?:YRS?|YEARS?|AGE))\b", _normalize_age_years),
+    (r"\b(ABOVE\s*\d+\s*(?:YRS?|YEARS?|AGE))\b", _normalize_age_above),
+    (r"\b(UPTO\s*\d+\s*(?:YRS?|YEARS?|AGE))\b", _normalize_age_years),
+    (r"\b(\d+\s*\+\s*(?:YRS?|YEARS?|AGE))\b", _normalize_age_years),
+    (r"\b(\d+(?:ST|ND|RD|TH)\s*YEAR)\b", _normalize_upper),
 ]
 
 GVW_REGEX_PATTERNS = [
-    re.compile(r"([<>]=?)\s*(\d+(?:\.\d+)?)\s*GVW", re.IGNORECASE),
-    re.compile(r"(\d+(?:\.\d+)?\s*-\s*\d+(?:\.\d+)?)\s*T\b", re.IGNORECASE),
-    re.compile(r"([<>]=?)\s*(\d+(?:\.\d+)?)\s*T\b", re.IGNORECASE),
+    (r"([<>]=?)\s*(\d+(?:\.\d+)?)\s*GVW", _normalize_joined_groups),
+    (r"(\d+(?:\.\d+)?\s*-\s*\d+(?:\.\d+)?)\s*T\b", _normalize_joined_groups),
+    (r"([<>]=?)\s*(\d+(?:\.\d+)?)\s*T\b", _normalize_joined_groups),
 ]
 
 SEATING_CAP_REGEX_PATTERNS_CONTEXTUAL = [
-    (re.compile(r"(>\s*18\s*UPTO\s*36\s*SEATER)", re.IGNORECASE), lambda m: ">18 UPTO 36"),
-    (re.compile(r"([<>]=?)\s*(\d+)\s*SEATER", re.IGNORECASE), lambda m: f"{m.group(1)}{m.group(2)}".replace(" ","")),
-    (re.compile(r"([<>]=?)\s*(\d+)\b", re.IGNORECASE), lambda m: f"{m.group(1)}{m.group(2)}".replace(" ","")),
-    (re.compile(r"(\d+\s*-\s*\d+)\b", re.IGNORECASE), lambda m: m.group(1).replace(" ","")),
+    (r"(>\s*18\s*UPTO\s*36\s*SEATER)", ">18 UPTO 36"),
+    (r"([<>]=?)\s*(\d+)\s*SEATER", _normalize_sign_and_number),
+    (r"([<>]=?)\s*(\d+)\b", _normalize_sign_and_number),
+    (r"(\d+\s*-\s*\d+)\b", _normalize_first_group_no_spaces),
 ]
 
 
 ENGINE_TYPE_REGEX_PATTERNS = [
-    re.compile(r"([<>]=?)\s*(\d+)\s*HP\b", re.IGNORECASE),
-    re.compile(r"\bABOVE\s*(\d+)\s*HP\b", re.IGNORECASE),
-    re.compile(r"([<>]=?)\s*(\d+)\s*CC\b", re.IGNORECASE),
+    (r"([<>]=?)\s*(\d+)\s*HP\b", _normalize_upper_no_spaces),
+    (r"\bABOVE\s*(\d+)\s*HP\b", _normalize_upper_no_spaces),
+    (r"([<>]=?)\s*(\d+)\s*CC\b", _normalize_upper_no_spaces),
 ]
 
-PLAN_TYPE_KEYWORDS = {
-    "AOTP": "SATP", "SATP": "SATP", "TP": "SATP",
-    "ON OD": "SAOD", "OD": "SAOD",
-    "COMP": "COMP"
-}
-PLAN_TYPE_REGEX_STR = r"\b(" + "|".join(re.escape(k) for k in PLAN_TYPE_KEYWORDS.keys()) + r")\b"
+class AttributeExtractor:
+    # One attribute's pattern family, tried with .search() in list order: the
+    # first pattern that matches wins. Segment and header texts repeat heavily
+    # across a grid, so results are memoized per text (bounded by
+    # max_cache_size). The patterns are compiled on first use rather than at import.
+    def __init__(self, family, patterns, flags=re.IGNORECASE, max_cache_size=50000):
+        self.family = family
+        self.patterns = patterns
+        self.flags = flags
+        self.regexes = None
+        self.cache = {}
+        self.max_cache_size = max_cache_size
+
+    def compile(self):
+        self.regexes = [(re.compile(pattern_str, self.flags), normalizer) for pattern_str, normalizer in self.patterns]
+        return self.regexes
+
+    def extract(self, text):
+        try:
+            return self.cache[text]
+        except KeyError:
+            pass
+        value = self.scan(text)
+        if len(self.cache) >= self.max_cache_size:
+            self.cache.clear()
+        self.cache[text] = value
+        return value
+
+    def scan(self, text):
+        for regex, normalizer in (self.regexes if self.regexes is not None else self.compile()):
+            match = regex.search(text)
+            if match:
+                if not callable(normalizer):
+                    return normalizer
+                return normalizer(match.group(0), match.groups())
+        return None
+
+AGE_EXTRACTOR = AttributeExtractor("age", AGE_KEYWORD_PATTERNS)
+GVW_EXTRACTOR = AttributeExtractor("gvw", GVW_REGEX_PATTERNS)
+SEATING_CAP_EXTRACTOR = AttributeExtractor("seating", SEATING_CAP_REGEX_PATTERNS_CONTEXTUAL)
+ENGINE_TYPE_EXTRACTOR = AttributeExtractor("engine", ENGINE_TYPE_REGEX_PATTERNS)
+
+PLAN_TYPE_KEYWORDS = KEYWORDS["plan_types"]
+PLAN_TYPE_REGEX_STR = KEYWORDS["plan_type_regex_source"]
 PLAN_TYPE_REGEX = re.compile(PLAN_TYPE_REGEX_STR, re.IGNORECASE)
 
+# Fixed patterns used inline by the parsers, compiled once here.
+WHITESPACE_RUN_REGEX_STR = r"\s+"
+WHITESPACE_RUN_REGEX = re.compile(WHITESPACE_RUN_REGEX_STR)
+EXPLICIT_PERCENT_REGEX = re.compile(r"(\d+(?:\.\d+)?%)")
+BARE_NUMBER_REGEX = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*$")
+MAIN_HEADER_AGE_REGEX = re.compile(r"([<>]=?\s*\d+\s*(?:YRS?|YEARS?|AGE))", re.IGNORECASE)
+AGE_UNIT_REGEX = re.compile(r"(YRS?|YEARS?|AGE)", re.IGNORECASE)
+PAREN_CONTENT_REGEX = re.compile(r"\((.*?)\)")
+MAIN_HEADER_COMMON_WORD_REGEXES = {word: re.compile(r'\b' + re.escape(word) + r'\b', re.IGNORECASE) for word in ["GRID", "ONLY", "AND", "&", "AOTP", "MHCV", "LCV"]}
+EXCLUSION_KEYWORDS = ["EXCLUDING", "EXCEPT"]
+EXCLUSION_REMARK_REGEXES = {ex_kw: re.compile(rf"(\b{ex_kw}[^\(\)]*\b)", re.IGNORECASE) for ex_kw in EXCLUSION_KEYWORDS}
+THREE_WHEELER_REGEX = re.compile(r"\b3W\b")
+TWO_WHEELER_REGEX = re.compile(r"\b2W\b")
+BUS_SEATER_REGEX = re.compile(r"\b(BUS|SEATER)\b", re.IGNORECASE)
+# Patterns built from header values at run time (main-table vehicle type, age,
+# makes) are compiled once per distinct pattern through cached_regex().
+DYNAMIC_REGEX_CACHE = {}
+
+# Intra-table parallelism: a table with at least PARALLEL_TABLE_MIN_CELLS data
+# cells is split into row chunks parsed on PARALLEL_TABLE_WORKERS processes
+# (0 or 1 keeps every table serial). Smaller tables are not worth the pool.
+PARALLEL_TABLE_WORKERS = 0
+PARALLEL_TABLE_MIN_CELLS = 20000
+PARALLEL_TABLE_CHUNKS_PER_WORKER = 4
+# "cost" cuts the table into row ranges of equal estimated parse cost
+# (estimate_cell_cost); "rows" cuts equal row ranges.
+PARALLEL_TABLE_PARTITION = "cost"
+
+
+# --- Output Row Record ---
+OUTPUT_COLUMN_INDEX = {col: idx for idx, col in enumerate(OUTPUT_COLUMNS)}
+
+class OutputRow:
+    # One output row backed by a flat list in OUTPUT_COLUMNS order. Column-header
+    # internals (exclusions, header make/vehicle/fuel lists, header remark, table
+    # label) live in header_meta, which is shared by reference between clones: it
+    # is filled while the header plan is built (parse_column_header_text,
+    # build_header_plan) and only read once rows are cloned from it.
+    __slots__ = ("values", "header_meta")
+
+    def __init__(self, values=None, header_meta=None):
+        self.values = values if values is not None else [None] * len(OUTPUT_COLUMNS)
+        self.header_meta = header_meta if header_meta is not None else {}
+
+    def __getitem__(self, col):
+        return self.values[OUTPUT_COLUMN_INDEX[col]]
+
+    def __setitem__(self, col, value):
+        self.values[OUTPUT_COLUMN_INDEX[col]] = value
+
+    def get(self, col, default=None):
+        # Unlike dict.get, a stored None also gives default: every column exists,
+        # and None is how an unset column is stored.
+        value = self.values[OUTPUT_COLUMN_INDEX[col]]
+        return default if value is None else value
+
+    def copy(self):
+        return OutputRow(self.values[:], self.header_meta)
+
+    def to_dict(self):
+        return dict(zip(OUTPUT_COLUMNS, self.values))
+
+    def __repr__(self):
+        return f"OutputRow({self.to_dict()}, header_meta={self.header_meta})"
+
+
+# --- Worksheet Merge Map ---
+XLSX_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+XLSX_DOC_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+XLSX_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+MERGE_MAP_MAX_CELLS_PER_RANGE = 100000
+
+class MergeMap:
+    # Merged ranges of one worksheet in 0-based (row, col) coordinates, i.e. the
+    # same positions as df_sheet.iloc. owner() resolves any covered cell to the
+    # top-left cell that holds the value (pandas reads the rest as blanks) in O(1).
+    def __init__(self, merged_ranges=()):
+        self.ranges = []
+        self.anchor_of = {}
+        self.oversized_ranges = []
+        for min_col, min_row, max_col, max_row in merged_ranges:
+            merged_range = (min_row - 1, min_col - 1, max_row - 1, max_col - 1)
+            self.ranges.append(merged_range)
+            if (max_row - min_row + 1) * (max_col - min_col + 1) > MERGE_MAP_MAX_CELLS_PER_RANGE:
+                self.oversized_ranges.append(merged_range)
+                continue
+            for row in range(merged_range[0], merged_range[2] + 1):
+                for col in range(merged_range[1], merged_range[3] + 1):
+                    self.anchor_of[(row, col)] = (merged_range[0], merged_range[1])
+        self.ranges.sort()
+
+    def __bool__(self):
+        return bool(self.ranges)
+
+    def owner(self, row, col):
+        anchor = self.anchor_of.get((row, col))
+        if anchor is not None:
+            return anchor
+        for min_row, min_col, max_row, max_col in self.oversized_ranges:
+            if min_row <= row <= max_row and min_col <= col <= max_col:
+                return (min_row, min_col)
+        return (row, col)
+
+def read_merge_map(workbook_path, sheet_name):
+    # Reads <mergeCell> refs straight from the .xlsx sheet XML; pandas drops them
+    # and openpyxl's read-only mode (what pandas uses) does not expose them.
+    # Non-xlsx workbooks (.xlsb, .xls) get an empty map.
+    from openpyxl.utils.cell import range_boundaries
+    merged_ranges = []
+    try:
+        with zipfile.ZipFile(workbook_path) as archive:
+            workbook_xml = ET.fromstring(archive.read("xl/workbook.xml"))
+            rel_id = next(sheet.get(f"{XLSX_DOC_REL_NS}id") for sheet in workbook_xml.iter(f"{XLSX_MAIN_NS}sheet") if sheet.get("name") == sheet_name)
+            workbook_rels = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+            target = next(rel.get("Target") for rel in workbook_rels.iter(f"{XLSX_PKG_REL_NS}Relationship") if rel.get("Id") == rel_id)
+            sheet_path = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+            with archive.open(sheet_path) as sheet_xml:
+                for _, element in ET.iterparse(sheet_xml):
+                    if element.tag == f"{XLSX_MAIN_NS}mergeCell":
+                        merged_ranges.append(range_boundaries(element.get("ref")))
+                    element.clear()
+    except (zipfile.BadZipFile, KeyError, StopIteration, ET.ParseError, ValueError, OSError) as e:
+        print(f"DEBUG: read_merge_map: No merged ranges read for sheet '{sheet_name}': {e!r}")
+        return MergeMap()
+    return MergeMap(merged_ranges)
+
 
 # --- Helper Functions ---
+def cached_regex(pattern_str, flags=0):
+    pattern = DYNAMIC_REGEX_CACHE.get((pattern_str, flags))
+    if pattern is None:
+        pattern = DYNAMIC_REGEX_CACHE[(pattern_str, flags)] = instrument_pattern(f"dynamic {pattern_str!r}", re.compile(pattern_str, flags))
+    return pattern
+
 def clean_text_general(text):
-    if pd.isna(text) or text is None:
+    if text is None:
+        return ""
+    if isinstance(text, float):
+        if math.isnan(text): return ""
+    elif not isinstance(text, (str, int)) and pd.isna(text):
         return ""
     text = str(text)
     text = text.replace('\n', ' ').replace('\r', ' ')
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = WHITESPACE_RUN_REGEX.sub(' ', text).strip()
     return text
 
 def find_header_row(df, keyword="RTO CLUSTER", start_row=0): # Added start_row
@@ -120,16 +601,22 @@ def find_header_row(df, keyword="RTO CLUSTER", start_row=0): # Added start_row
     print(f"DEBUG: find_header_row: Header keyword '{keyword.upper()}' not found after row {start_row}.")
     return None
 
+SLAB_MONTH_BANNER_REGEX = re.compile(r"CV\s*AGENCY\s*GRID\s*([A-Z]+(?:UARY|BRUARY|RCH|RIL|MAY|JUNE|JULY|GUST|TEMBER|TOBER|VEMBER|CEMBER)?\'?\s*\d{2,4})")
+SLAB_MONTH_PARTS_REGEX = re.compile(r"([A-Z]+)(\d+)")
+SLAB_MONTH_NAME_REGEX = re.compile(r"(?<![A-Z])(JAN(?:UARY)?|FEB(?:RUARY)?|MAR(?:CH)?|APR(?:IL)?|MAY|JUNE?|JULY?|AUG(?:UST)?|SEPT?(?:EMBER)?|OCT(?:OBER)?|NOV(?:EMBER)?|DEC(?:EMBER)?)(?![A-Z])\s*[\'\-_]?\s*(\d{4}|\d{2})(?!\d)")
+SLAB_MONTH_CACHE = {}
+
 def extract_slab_month_from_df(df):
     # print("DEBUG: extract_slab_month_from_df: Extracting slab month")
-    for i in range(min(15, len(df))):
-        for j in range(min(10, len(df.columns))):
-            cell_text_cleaned = clean_text_general(df.iloc[i, j]).upper()
-            match = re.search(r"CV\s*AGENCY\s*GRID\s*([A-Z]+(?:UARY|BRUARY|RCH|RIL|MAY|JUNE|JULY|GUST|TEMBER|TOBER|VEMBER|CEMBER)?\'?\s*\d{2,4})", cell_text_cleaned)
+    banner_window = df.iloc[:15, :10].to_numpy(dtype=object)
+    for i in range(banner_window.shape[0]):
+        for j in range(banner_window.shape[1]):
+            cell_text_cleaned = clean_text_general(banner_window[i, j]).upper()
+            match = SLAB_MONTH_BANNER_REGEX.search(cell_text_cleaned)
             if match:
                 slab_month_raw = match.group(1)
                 slab_month_normalized = slab_month_raw.replace("'", "").replace(" ", "")
-                month_year_match = re.match(r"([A-Z]+)(\d+)", slab_month_normalized)
+                month_year_match = SLAB_MONTH_PARTS_REGEX.match(slab_month_normalized)
                 if month_year_match:
                     month_part = month_year_match.group(1)[:3]
                     year_part = month_year_match.group(2)
@@ -142,11 +629,51 @@ def extract_slab_month_from_df(df):
     # print("DEBUG: extract_slab_month_from_df: Slab month not found.")
     return None
 
+def extract_slab_month_from_name(name):
+    # "icici CV april 25 2nd" -> "Apr25", "CV Grid Feb'2025" -> "Feb25"
+    match = SLAB_MONTH_NAME_REGEX.search(name.upper())
+    if not match:
+        return None
+    year_part = match.group(2)[-2:]
+    return f"{match.group(1)[:3].capitalize()}{year_part}"
+
+def resolve_slab_month(workbook_path=None, sheet_names=(), banner_df=None):
+    # One slab month per workbook: the "CV AGENCY GRID <month>" banner first, then
+    # the sheet names, then the file name. Cached per file (path, mtime, size), so
+    # every sheet and table of a workbook, and reruns over it, agree; a month that
+    # was not found is cached as None too, and sheets do not rescan for it.
+    cache_key = None
+    if workbook_path is not None:
+        try:
+            workbook_stat = os.stat(workbook_path)
+            cache_key = (os.path.abspath(workbook_path), workbook_stat.st_mtime_ns, workbook_stat.st_size)
+        except OSError:
+            pass
+    if cache_key is not None and cache_key in SLAB_MONTH_CACHE:
+        return SLAB_MONTH_CACHE[cache_key]
+
+    slab_month, source = None, None
+    if banner_df is not None:
+        slab_month, source = extract_slab_month_from_df(banner_df), "banner"
+    if not slab_month:
+        for sheet_name in sheet_names:
+            slab_month, source = extract_slab_month_from_name(str(sheet_name)), f"sheet name '{sheet_name}'"
+            if slab_month: break
+    if not slab_month and workbook_path is not None:
+        slab_month, source = extract_slab_month_from_name(os.path.splitext(os.path.basename(workbook_path))[0]), "file name"
+    if not slab_month:
+        source = "not found"
+    print(f"INFO: resolve_slab_month: Slab month {slab_month} ({source})")
+
+    if cache_key is not None:
+        SLAB_MONTH_CACHE[cache_key] = slab_month
+    return slab_month
+
 def extract_explicit_percentage(text_segment):
-    match = re.search(r"(\d+(?:\.\d+)?%)", text_segment)
+    match = EXPLICIT_PERCENT_REGEX.search(text_segment)
     if match:
         return match.group(1)
-    num_match = re.match(r"^\s*(\d+(?:\.\d+)?)\s*$", text_segment)
+    num_match = BARE_NUMBER_REGEX.match(text_segment)
     if num_match:
         try:
             num_val = float(num_match.group(1))
@@ -180,11 +707,37 @@ def extract_explicit_percentage(text_segment):
             return "0%"
     return None
 
+def format_numeric_percentage(value):
+    # po_percent for a native numeric cell (0.15 -> "15%", 0.155 -> "15.5%", 15 -> "15%"),
+    # computed from the number itself. Gives exactly what
+    # extract_explicit_percentage(str(value)) gives; returns None for values whose
+    # str() that path would not read as a bare number (bools, negatives, NaN/inf,
+    # exponent notation) so they take the text path.
+    if isinstance(value, bool) or not isinstance(value, (int, float, numbers.Integral)):
+        return None
+    num_val = float(value)
+    if not math.isfinite(num_val) or num_val < 0:
+        return None
+    is_float = isinstance(value, float)
+    if is_float and (num_val >= 1e16 or 0 < num_val < 1e-4):
+        return None
+    if is_float and 0 < num_val <= 1:
+        val_as_percent = num_val * 100
+        if val_as_percent == int(val_as_percent):
+            return f"{int(val_as_percent)}%"
+        return f"{f'{val_as_percent:.1f}'.rstrip('0').rstrip('.')}%"
+    if num_val == int(num_val):
+        return f"{int(num_val)}%"
+    formatted_num_str = f"{num_val:.1f}"
+    if formatted_num_str.endswith(".0"):
+        return f"{int(num_val)}%"
+    return f"{formatted_num_str.rstrip('0').rstrip('.')}%"
+
 
 def parse_main_table_header(header_text_full):
     context = {"bike_makes_main": [], "remarks_main": [], "age_main": None, "plan_type_main": None, "veh_type_main": None}
     text_cleaned_orig = clean_text_general(header_text_full)
-    text_upper = text_cleaned_orig.upper()
+    text_upper = keyword_match_text(text_cleaned_orig.upper())
     print(f"DEBUG: parse_main_table_header: Parsing main table header: '{header_text_full}' -> '{text_upper}'")
 
     veh_type_match_obj = VEHICLE_CATEGORY_REGEX.search(text_upper)
@@ -195,7 +748,7 @@ def parse_main_table_header(header_text_full):
     if plan_type_match_obj:
         context["plan_type_main"] = PLAN_TYPE_KEYWORDS.get(plan_type_match_obj.group(1).upper())
 
-    age_search_main_obj = re.search(r"([<>]=?\s*\d+\s*(?:YRS?|YEARS?|AGE))", text_upper, re.IGNORECASE)
+    age_search_main_obj = MAIN_HEADER_AGE_REGEX.search(text_upper)
     if age_search_main_obj:
         context["age_main"] = age_search_main_obj.group(1).upper().replace("AGE","YRS").replace("YEARS","YRS").replace("YEAR","YRS").replace(" ","")
 
@@ -204,21 +757,21 @@ def parse_main_table_header(header_text_full):
          context["bike_makes_main"] = list(set((bm[0] if isinstance(bm, tuple) else bm).upper() for bm in bike_makes_found_tuples))
 
     all_remarks_main_header = []
-    paren_remarks = re.findall(r"\((.*?)\)", text_cleaned_orig)
+    paren_remarks = PAREN_CONTENT_REGEX.findall(text_cleaned_orig)
     for pr in paren_remarks:
         all_remarks_main_header.append(f"({pr})")
 
     temp_remark_check = text_cleaned_orig
-    if context.get("veh_type_main"): temp_remark_check = re.sub(re.escape(context["veh_type_main"]),"", temp_remark_check, flags=re.IGNORECASE, count=1)
+    if context.get("veh_type_main"): temp_remark_check = cached_regex(re.escape(context["veh_type_main"]), re.IGNORECASE).sub("", temp_remark_check, count=1)
     if context.get("age_main"):
         age_keyword_for_re = context["age_main"].replace(">","").replace("<","").replace("=","")
-        age_keyword_for_re = re.sub(r"(YRS?|YEARS?|AGE)","", age_keyword_for_re, flags=re.IGNORECASE).strip()
+        age_keyword_for_re = AGE_UNIT_REGEX.sub("", age_keyword_for_re).strip()
         if age_keyword_for_re:
-             temp_remark_check = re.sub(r'\b'+re.escape(age_keyword_for_re)+r'\b',"", temp_remark_check, flags=re.IGNORECASE, count=1)
-    for bm in context.get("bike_makes_main",[]): temp_remark_check = re.sub(r'\b'+re.escape(bm)+r'\b',"", temp_remark_check, flags=re.IGNORECASE, count=1)
+             temp_remark_check = cached_regex(r'\b'+re.escape(age_keyword_for_re)+r'\b', re.IGNORECASE).sub("", temp_remark_check, count=1)
+    for bm in context.get("bike_makes_main",[]): temp_remark_check = cached_regex(r'\b'+re.escape(bm)+r'\b', re.IGNORECASE).sub("", temp_remark_check, count=1)
 
-    for common_word in ["GRID", "ONLY", "AND", "&", "AOTP", "MHCV", "LCV"]:
-        temp_remark_check = re.sub(r'\b'+re.escape(common_word)+r'\b',"", temp_remark_check, flags=re.IGNORECASE)
+    for common_word_regex in MAIN_HEADER_COMMON_WORD_REGEXES.values():
+        temp_remark_check = common_word_regex.sub("", temp_remark_check)
     temp_remark_check = temp_remark_check.replace("(","").replace(")","").strip(" ,.-")
 
     if len(temp_remark_check) > 3 and temp_remark_check.lower() not in ["aotp", "mhcv", "lcv", "tata", "al"]:
@@ -232,7 +785,7 @@ def parse_main_table_header(header_text_full):
 def parse_column_header_text(header_cell_text_original):
     base_details = defaultdict(lambda: None)
     text_original_cleaned = clean_text_general(header_cell_text_original)
-    text_upper = text_original_cleaned.upper()
+    text_upper = keyword_match_text(text_original_cleaned.upper())
 
     base_details["remarks_col_header_list"] = []
     # print(f"DEBUG: parse_column_header_text: Parsing column header: '{header_cell_text_original}' -> '{text_upper}'")
@@ -242,11 +795,10 @@ def parse_column_header_text(header_cell_text_original):
     exclusion_triggered = False
     excluded_makes_in_header = []
     excluded_vehicles_in_header = []
-    exclusion_keywords = ["EXCLUDING", "EXCEPT"]
-    for ex_kw in exclusion_keywords:
+    for ex_kw in EXCLUSION_KEYWORDS:
         if ex_kw in text_upper:
             exclusion_triggered = True
-            ex_match_remark = re.search(rf"(\b{ex_kw}[^\(\)]*\b)", text_original_cleaned, re.IGNORECASE)
+            ex_match_remark = EXCLUSION_REMARK_REGEXES[ex_kw].search(text_original_cleaned)
             if ex_match_remark:
                  base_details["remarks_col_header_list"].append(ex_match_remark.group(1).strip())
             parts_after_exclusion = text_upper.split(ex_kw, 1)
@@ -285,7 +837,7 @@ def parse_column_header_text(header_cell_text_original):
             sv_match_raw = sv_match_raw_tuple if isinstance(sv_match_raw_tuple, str) else sv_match_raw_tuple[0]
             vehicle_parts_from_match = [p.strip().upper() for p in sv_match_raw.upper().split('/') if p.strip()]
             for vp_upper in vehicle_parts_from_match:
-                if vp_upper in SPECIFIC_VEHICLES and not (exclusion_triggered and vp_upper in base_details["excluded_vehicles_col_header"]):
+                if vp_upper in SPECIFIC_VEHICLE_SET and not (exclusion_triggered and vp_upper in base_details["excluded_vehicles_col_header"]):
                     header_vehicles_list.append(vp_upper)
 
     base_details["header_specific_vehicles_list"] = list(set(header_vehicles_list))
@@ -298,43 +850,35 @@ def parse_column_header_text(header_cell_text_original):
              base_details["veh_type"] = "MISC"; base_details["product_type"] = "MISCELLANEOUS VEHICLE"
 
     if not base_details.get("vehicle"):
-        if re.search(r"\b3W\b", text_upper): base_details["vehicle"] = "3W"
-        elif re.search(r"\b2W\b", text_upper): base_details["vehicle"] = "2W"
+        if THREE_WHEELER_REGEX.search(text_upper): base_details["vehicle"] = "3W"
+        elif TWO_WHEELER_REGEX.search(text_upper): base_details["vehicle"] = "2W"
 
-    for age_pattern, age_val_fixed in AGE_KEYWORD_PATTERNS:
-        if isinstance(age_val_fixed, str) and age_val_fixed in ["NEW", "OLD"]:
-            if age_pattern.search(text_upper):
-                base_details["age"] = age_val_fixed
-                break
+    header_age = AGE_EXTRACTOR.extract(text_upper)
+    if header_age in ["NEW", "OLD"]:
+        base_details["age"] = header_age
 
     base_details["found_fuel_types_col_header"] = list(set( (ft[0] if isinstance(ft, tuple) else ft).upper() for ft in FUEL_TYPE_REGEX.findall(text_upper)))
 
-    for pattern in GVW_REGEX_PATTERNS:
-        gvw_match = pattern.search(text_upper)
-        if gvw_match:
-            base_details["gvw"] = "".join(g.strip() for g in gvw_match.groups() if g).upper()
-            break
+    header_gvw = GVW_EXTRACTOR.extract(text_upper)
+    if header_gvw:
+        base_details["gvw"] = header_gvw
 
     is_bus_type_header = base_details.get("veh_type") == "PCV" or \
                          (base_details.get("vehicle") and "BUS" in base_details.get("vehicle","").upper()) or \
                          ("BUS" in text_upper or "SEATER" in text_upper)
     if is_bus_type_header:
         text_to_search_seating_h = text_upper
-        bus_seater_keyword_match_h = re.search(r"\b(BUS|SEATER)\b", text_upper, re.IGNORECASE)
+        bus_seater_keyword_match_h = BUS_SEATER_REGEX.search(text_upper)
         if bus_seater_keyword_match_h:
             text_to_search_seating_h = text_upper[bus_seater_keyword_match_h.end():]
-        for pattern, resolver in SEATING_CAP_REGEX_PATTERNS_CONTEXTUAL:
-            sc_match_h = pattern.search(text_to_search_seating_h)
-            if sc_match_h:
-                base_details["seating_cap"] = resolver(sc_match_h)
-                break
-    for pattern_et in ENGINE_TYPE_REGEX_PATTERNS:
-        et_match = pattern_et.search(text_upper)
-        if et_match:
-            base_details["engine_type"] = et_match.group(0).upper().replace(" ","")
-            break
-
-    bracket_remarks = re.findall(r"\((.*?)\)", text_original_cleaned)
+        header_seating_cap = SEATING_CAP_EXTRACTOR.extract(text_to_search_seating_h)
+        if header_seating_cap:
+            base_details["seating_cap"] = header_seating_cap
+    header_engine_type = ENGINE_TYPE_EXTRACTOR.extract(text_upper)
+    if header_engine_type:
+        base_details["engine_type"] = header_engine_type
+
+    bracket_remarks = PAREN_CONTENT_REGEX.findall(text_original_cleaned)
     for br in bracket_remarks:
         if not BIKE_MAKE_REGEX.fullmatch(br.strip().upper()):
              base_details["remarks_col_header_list"].append(f"({br})")
@@ -356,33 +900,283 @@ def parse_column_header_text(header_cell_text_original):
     else:
         final_details["remarks_col_header"] = None
 
-    # print(f"DEBUG: parse_column_header_text: Parsed column header details: {dict(final_details)}")
-    return dict(final_details)
-
-def find_special_cluster_in_text(text_upper, is_for_override=True):
-    for scc in SPECIAL_CLUSTER_CODES:
-        scc_upper = scc
-        exact_pattern = r"\b" + re.escape(scc_upper) + r"\b"
-        exact_match = re.search(exact_pattern, text_upper)
-        if exact_match:
-            if not is_for_override: return scc_upper
-            if (re.search(r"\b" + re.escape(scc_upper) + r"\s+ONLY\b", text_upper) or \
-                re.search(r"\bONLY\s+" + re.escape(scc_upper) + r"\b", text_upper) or \
-                re.search(r"\bIN\s+" + re.escape(scc_upper) + r"\b", text_upper)):
-                return scc_upper
-        if is_for_override:
-            concat_pattern = r"\b(" + re.escape(scc_upper) + r")(ONLY\b|ONLY$)"
-            concat_match = re.search(concat_pattern, text_upper)
-            if concat_match:
-                return concat_match.group(1).upper()
+    header_row = OutputRow()
+    for k, v in final_details.items():
+        if k in OUTPUT_COLUMN_INDEX:
+            header_row[k] = v
+        else:
+            header_row.header_meta[k] = v
+
+    # print(f"DEBUG: parse_column_header_text: Parsed column header details: {header_row}")
+    return header_row
+
+# --- Cell Text Lexer ---
+# A condition cell is read once into a token stream of (kind, text, start, end):
+#   PERCENT "45%", NUMBER "5" / "0.5", the keyword kinds MAKE, CLUSTER, PLAN and
+#   FUEL, CLUSTER_ONLY (a code run into ONLY, "WB1ONLY"), AGE (NEW/OLD, YRS/YEARS/
+#   AGE units, "1STYEAR"), ONLY, OTHERS, IN, EXCEPT (or EXCLUDING), PAREN_OPEN,
+#   PAREN_CLOSE, COMMA, WORD (any other word) and SYMBOL (any other character).
+# Whitespace is skipped and every other character lands in some token, so tokens
+# next to each other in the list are separated by nothing but whitespace.
+# CELL_TOKEN_REGEX splits the text into basic tokens in one pass; keywords are
+# then recognized by looking the basic tokens up in a phrase index built from the
+# keyword lists ("ASHOK LEYLAND" is WORD, " ", WORD; "KA01-05" is WORD, NUMBER,
+# "-", NUMBER), with the same word-boundary rules and priority (cluster, make,
+# plan, fuel; longest first) as the keyword regexes. PERCENT tokens are exactly
+# the matches of EXPLICIT_PERCENT_REGEX.
+CELL_TOKEN_REGEX = re.compile(
+    r"(?P<PERCENT>\d+(?:\.\d+)?%)"
+    # "1.2.5%" reads as 1, ".", "2.5%", the way EXPLICIT_PERCENT_REGEX sees it.
+    r"|(?P<NUMBER>\d+(?:\.\d+(?![.\d]*%))?)"
+    r"|(?P<WORD>[^\W\d]+)|(?P<PAREN_OPEN>\()|(?P<PAREN_CLOSE>\))|(?P<COMMA>,)|(?P<SYMBOL>\S)")
+CELL_WORD_KINDS = {"ONLY": "ONLY", "OTHERS": "OTHERS", "IN": "IN", "EXCEPT": "EXCEPT", "EXCLUDING": "EXCEPT", "NEW": "AGE", "OLD": "AGE"}
+CELL_AGE_UNITS = ("YR", "YRS", "YEAR", "YEARS", "AGE")
+CELL_AGE_ORDINALS = ("ST", "ND", "RD", "TH")
+# Basic tokens that start / end with a word character, for the \b checks.
+CELL_WORD_START_KINDS = ("WORD", "NUMBER", "PERCENT")
+CELL_WORD_END_KINDS = ("WORD", "NUMBER")
+# First basic token (upper-cased) -> [(token texts, separators, kind), ...] in
+# priority order. Filled on first use by cell_keyword_phrases().
+CELL_KEYWORD_PHRASES = {}
+CELL_TEXT_CACHE_MAX = 50000
+SEGMENT_FACTS_CACHE = {}
+CELL_ANALYSIS_CACHE = {}
+
+def cell_keyword_phrases():
+    if not CELL_KEYWORD_PHRASES:
+        for kind, keywords in (("CLUSTER", SPECIAL_CLUSTER_CODES), ("MAKE", BIKE_MAKES), ("PLAN", PLAN_TYPE_KEYWORDS), ("FUEL", FUEL_TYPES)):
+            for keyword in keywords:
+                basic_tokens = [(match.group(), match.start(), match.end()) for match in CELL_TOKEN_REGEX.finditer(keyword.upper())]
+                texts = tuple(text for text, _, _ in basic_tokens)
+                separators = ("",) + tuple(keyword.upper()[basic_tokens[idx - 1][2]:basic_tokens[idx][1]] for idx in range(1, len(basic_tokens)))
+                CELL_KEYWORD_PHRASES.setdefault(texts[0], []).append((texts, separators, kind))
+    return CELL_KEYWORD_PHRASES
+
+def match_cell_keyword_phrase(text, basic_tokens, token_idx):
+    # (kind, index past the phrase) for the keyword phrase starting at
+    # basic_tokens[token_idx], or None. A cluster code whose last word runs into
+    # ONLY ("DLONLY", "WB1" + "ONLY") comes back as CLUSTER_ONLY.
+    first_upper = basic_tokens[token_idx][1].upper()
+    candidates = CELL_KEYWORD_PHRASES.get(first_upper)
+    if candidates is None and first_upper.endswith("ONLY"):
+        candidates = CELL_KEYWORD_PHRASES.get(first_upper[:-len("ONLY")])
+    if candidates is None: return None
+    for texts, separators, kind in candidates:
+        end_idx = token_idx + len(texts)
+        if end_idx > len(basic_tokens): continue
+        run_into_only = False
+        for offset, phrase_text in enumerate(texts):
+            _, token_text, token_start, _ = basic_tokens[token_idx + offset]
+            if offset and text[basic_tokens[token_idx + offset - 1][3]:token_start] != separators[offset]: break
+            token_upper = token_text.upper()
+            if token_upper == phrase_text: continue
+            if offset == len(texts) - 1 and kind == "CLUSTER" and token_upper == phrase_text + "ONLY":
+                run_into_only = True
+                continue
+            break
+        else:
+            next_token = basic_tokens[end_idx] if end_idx < len(basic_tokens) else None
+            glued_next = next_token is not None and next_token[2] == basic_tokens[end_idx - 1][3]
+            if kind == "CLUSTER" and glued_next and next_token[0] == "WORD" and next_token[1].upper() == "ONLY":
+                if end_idx + 1 < len(basic_tokens) and basic_tokens[end_idx + 1][2] == next_token[3] and basic_tokens[end_idx + 1][0] in CELL_WORD_START_KINDS: continue
+                return "CLUSTER_ONLY", end_idx + 1
+            if run_into_only:
+                if glued_next and next_token[0] in CELL_WORD_START_KINDS: continue
+                return "CLUSTER_ONLY", end_idx
+            if glued_next and next_token[0] in CELL_WORD_START_KINDS:
+                # "AOTP60%": a plan type run into the next percentage still names the plan.
+                if not (kind == "PLAN" and next_token[0] == "PERCENT"): continue
+            return kind, end_idx
     return None
 
+def tokenize_cell_text(text):
+    basic_tokens = [(match.lastgroup, match.group(), match.start(), match.end()) for match in CELL_TOKEN_REGEX.finditer(text)]
+    if not CELL_KEYWORD_PHRASES: cell_keyword_phrases()
+    tokens = []
+    token_idx = 0
+    while token_idx < len(basic_tokens):
+        kind, token_text, start, end = basic_tokens[token_idx]
+        previous_token = basic_tokens[token_idx - 1] if token_idx else None
+        glued_previous = previous_token is not None and previous_token[3] == start and previous_token[0] in CELL_WORD_END_KINDS
+        if kind == "WORD" or kind == "NUMBER":
+            phrase = None if glued_previous else match_cell_keyword_phrase(text, basic_tokens, token_idx)
+            if phrase is not None:
+                kind, end_idx = phrase
+                end = basic_tokens[end_idx - 1][3]
+                tokens.append((kind, text[start:end], start, end))
+                token_idx = end_idx
+                continue
+        if kind == "WORD":
+            next_token = basic_tokens[token_idx + 1] if token_idx + 1 < len(basic_tokens) else None
+            glued_next = next_token is not None and next_token[2] == end and next_token[0] in CELL_WORD_START_KINDS
+            word_upper = token_text.upper()
+            if not glued_next:
+                if word_upper in CELL_WORD_KINDS and not glued_previous:
+                    kind = CELL_WORD_KINDS[word_upper]
+                elif word_upper in CELL_AGE_UNITS:
+                    kind = "AGE"
+                elif word_upper[:2] in CELL_AGE_ORDINALS and word_upper[2:] == "YEAR" and glued_previous and previous_token[0] == "NUMBER":
+                    kind = "AGE"
+        tokens.append((kind, token_text, start, end))
+        token_idx += 1
+    return tokens
+
+def special_cluster_from_tokens(tokens):
+    # A special cluster code overrides the row's cluster when it is qualified:
+    # "<code> ONLY", "ONLY <code>", "IN <code>", or run into ONLY ("WB1ONLY").
+    # Codes are tried in SPECIAL_CLUSTER_CODES order (longest first).
+    qualified_codes = set()
+    for token_idx, (kind, text, start, end) in enumerate(tokens):
+        if kind == "CLUSTER_ONLY":
+            qualified_codes.add(text[:-len("ONLY")].upper())
+        elif kind == "CLUSTER":
+            previous_token = tokens[token_idx - 1] if token_idx else None
+            next_token = tokens[token_idx + 1] if token_idx + 1 < len(tokens) else None
+            if (next_token is not None and next_token[0] == "ONLY" and next_token[2] > end) or \
+               (previous_token is not None and previous_token[0] in ("ONLY", "IN") and previous_token[3] < start):
+                qualified_codes.add(text.upper())
+    if not qualified_codes: return None
+    for scc_upper in SPECIAL_CLUSTER_CODES:
+        if scc_upper in qualified_codes:
+            return scc_upper
+    return None
+
+def segment_keyword_facts(text_upper):
+    # Everything the cell parser reads from one typo-corrected, upper-cased segment
+    # text, from a single tokenize pass. The age and engine extractors only run
+    # when the tokens hold an age word/unit or an HP/CC word, which every one of
+    # their patterns needs. Memoized per text; the dict is shared, do not modify.
+    facts = SEGMENT_FACTS_CACHE.get(text_upper)
+    if facts is not None:
+        return facts
+    tokens = tokenize_cell_text(text_upper)
+    kinds = {kind for kind, _, _, _ in tokens}
+    makes = [text.upper() for kind, text, _, _ in tokens if kind == "MAKE"]
+    first_plan = next((text.upper() for kind, text, _, _ in tokens if kind == "PLAN"), None)
+    facts = {
+        "makes": makes,
+        "plan_type": PLAN_TYPE_KEYWORDS.get(first_plan) if first_plan is not None else None,
+        "fuel_type": next((text.upper() for kind, text, _, _ in tokens if kind == "FUEL"), None),
+        "age": AGE_EXTRACTOR.extract(text_upper) if "AGE" in kinds else None,
+        "engine_type": ENGINE_TYPE_EXTRACTOR.extract(text_upper) if any(kind == "WORD" and text.upper() in ("HP", "CC") for kind, text, _, _ in tokens) else None,
+        "cluster_code": special_cluster_from_tokens(tokens) if ("CLUSTER" in kinds or "CLUSTER_ONLY" in kinds) else None,
+        "tata_only": "TATA" in makes and ("ONLY" in kinds or "CLUSTER_ONLY" in kinds),
+        "others": "OTHERS" in kinds,
+    }
+    if len(SEGMENT_FACTS_CACHE) >= CELL_TEXT_CACHE_MAX:
+        SEGMENT_FACTS_CACHE.clear()
+    SEGMENT_FACTS_CACHE[text_upper] = facts
+    return facts
+
+def associate_line_percentages(line_text):
+    # State machine over one line's tokens. Each PERCENT takes the text since the
+    # previous percentage as its condition ("1-5 yrs 45% / >5 yrs 55%"), unless
+    # that text is only separators or the first comma-separated chunk after it
+    # names a plan type ("60% AOTP, 40% COMP"); then it takes that chunk and the
+    # chunk (plus its comma) is consumed. Text left at the end of the line becomes
+    # a condition line of its own.
+    tokens = tokenize_cell_text(line_text)
+    percent_token_idxs = [token_idx for token_idx, token in enumerate(tokens) if token[0] == "PERCENT"]
+    if not percent_token_idxs:
+        return [{"po_percent": None, "associated_text": line_text, "is_condition_line": True}]
+
+    segments = []
+    last_po_end_on_line = 0
+    for percent_idx, token_idx in enumerate(percent_token_idxs):
+        _, po_value, po_start, po_end = tokens[token_idx]
+        if percent_idx + 1 < len(percent_token_idxs):
+            window_end_token_idx = percent_token_idxs[percent_idx + 1]
+            context_window_end_for_this_po = tokens[window_end_token_idx][2]
+        else:
+            window_end_token_idx = len(tokens)
+            context_window_end_for_this_po = len(line_text)
+
+        first_chunk_end = context_window_end_for_this_po
+        first_chunk_has_plan = False
+        for kind, _, start, _ in tokens[token_idx + 1:window_end_token_idx]:
+            if kind == "COMMA":
+                first_chunk_end = start
+                break
+            if kind == "PLAN": first_chunk_has_plan = True
+
+        text_before_this_po = line_text[last_po_end_on_line:po_start].strip()
+        text_immediately_after_po = line_text[po_end:context_window_end_for_this_po].strip()
+        first_chunk_after_po = line_text[po_end:first_chunk_end].strip()
+
+        assoc_text_for_segment = text_before_this_po
+        if not text_before_this_po.replace(",", "").strip() or first_chunk_has_plan:
+            assoc_text_for_segment = first_chunk_after_po
+        if not assoc_text_for_segment.strip() and text_before_this_po.strip():
+            assoc_text_for_segment = text_before_this_po
+        segments.append({"po_percent": po_value, "associated_text": assoc_text_for_segment})
+
+        last_po_end_on_line = po_end
+        if assoc_text_for_segment == first_chunk_after_po and text_immediately_after_po:
+            if text_immediately_after_po.startswith(first_chunk_after_po + ","):
+                last_po_end_on_line += 1
+            last_po_end_on_line += len(first_chunk_after_po)
+
+    remaining_text_at_line_end = line_text[last_po_end_on_line:].strip()
+    if remaining_text_at_line_end:
+        segments.append({"po_percent": None, "associated_text": remaining_text_at_line_end, "is_condition_line": True})
+    return segments
+
+def analyze_cell_text(cell_text):
+    # The part of parse_percentage_cell_text that depends on the cleaned cell text
+    # alone: (segments, general conditions from the condition lines, TATA-only
+    # flag). Every segment carries the keyword facts of its associated text.
+    # Memoized per cell text; the result is shared, do not modify.
+    analysis = CELL_ANALYSIS_CACHE.get(cell_text)
+    if analysis is not None:
+        return analysis
+
+    segments = []
+    for line_text in (cell_text.splitlines() if '\n' in cell_text else [cell_text]):
+        line_text = line_text.strip()
+        if line_text:
+            segments.extend(associate_line_percentages(line_text))
+
+    if not any(s.get("po_percent") for s in segments) and cell_text:
+        single_po = extract_explicit_percentage(cell_text)
+        if single_po:
+            assoc_text_for_single_po = cell_text.replace(single_po, "", 1).strip()
+            if len(segments) == 1 and segments[0].get("is_condition_line"):
+                segments = [{"po_percent": single_po, "associated_text": assoc_text_for_single_po}]
+            elif not segments:
+                segments.append({"po_percent": single_po, "associated_text": assoc_text_for_single_po})
+        elif not segments:
+            segments = [{"po_percent": None, "associated_text": cell_text, "is_condition_line": True}]
+
+    general_conditions = {}
+    for segment in segments:
+        facts = segment["facts"] = segment_keyword_facts(keyword_match_text(segment["associated_text"].upper()))
+        if not segment.get("is_condition_line"): continue
+        if not general_conditions.get("age_cond") and facts["age"]:
+            general_conditions["age_cond"] = facts["age"]
+        if facts["tata_only"]:
+            general_conditions["bike_make_cond"] = "TATA"
+        elif not general_conditions.get("bike_make_cond") and facts["makes"]:
+            general_conditions["bike_make_cond"] = facts["makes"][0]
+        if not general_conditions.get("plan_type_cond") and facts["plan_type"]:
+            general_conditions["plan_type_cond"] = facts["plan_type"]
+        if not general_conditions.get("cluster_code_cond") and facts["cluster_code"]:
+            general_conditions["cluster_code_cond"] = facts["cluster_code"]
+        if segment["associated_text"]:
+            cond_remarks = general_conditions.setdefault("cond_line_remark_list", [])
+            if segment["associated_text"] not in cond_remarks:
+                cond_remarks.append(segment["associated_text"])
+
+    analysis = (segments, general_conditions, segment_keyword_facts(keyword_match_text(cell_text.upper()))["tata_only"])
+    if len(CELL_ANALYSIS_CACHE) >= CELL_TEXT_CACHE_MAX:
+        CELL_ANALYSIS_CACHE.clear()
+    CELL_ANALYSIS_CACHE[cell_text] = analysis
+    return analysis
+
 
 def parse_percentage_cell_text(cell_text_original, base_header_details, rto_cluster_from_row, main_table_context_global):
     results = []
     cell_text_cleaned_orig_case = clean_text_general(cell_text_original)
     cell_text_cleaned_upper = cell_text_cleaned_orig_case.upper()
-    explicit_percent_regex_str = r"(\d+(?:\.\d+)?%)"
 
     is_table2_processing_target = main_table_context_global is not None and \
                                   rto_cluster_from_row == "ANDAMAN&NICOBAR" 
@@ -394,12 +1188,12 @@ def parse_percentage_cell_text(cell_text_original, base_header_details, rto_clus
         print(f"DETAILED DEBUG (TABLE 2 ANDAMAN): Main table context global (from Title): {main_table_context_global}")
 
 
-    non_data_values = ["DECLINE", "NO BUSINESS", "CC", "NO BIZ", "#REF!", "TBD", "IRDA"]
+    non_data_values = NON_DATA_CELL_VALUES
     if cell_text_cleaned_upper in non_data_values or not cell_text_cleaned_upper :
         entry = base_header_details.copy()
         entry["cluster_code"] = rto_cluster_from_row
         entry["po_percent"] = cell_text_cleaned_upper if cell_text_cleaned_upper else cell_text_original
-        current_remarks_list = [base_header_details.get("remarks_col_header")]
+        current_remarks_list = [base_header_details.header_meta.get("remarks_col_header")]
         
         if main_table_context_global:
             if is_table2_processing_target: print(f"DETAILED DEBUG (Non-data): Applying main_table_context_global: {main_table_context_global} to entry: {entry}")
@@ -424,117 +1218,22 @@ def parse_percentage_cell_text(cell_text_original, base_header_details, rto_clus
             if mcbm and entry.get("bike_make") is None : 
                 final_entry_for_non_data["bike_make"] = mcbm
             
-            if final_entry_for_non_data.get("bike_make") and final_entry_for_non_data.get("bike_make").upper() in base_header_details.get("excluded_makes_col_header",[]):
+            if final_entry_for_non_data.get("bike_make") and final_entry_for_non_data.get("bike_make").upper() in base_header_details.header_meta.get("excluded_makes_col_header",[]):
                 final_entry_for_non_data["bike_make"] = None
-            if final_entry_for_non_data.get("vehicle") and final_entry_for_non_data.get("vehicle").upper() in base_header_details.get("excluded_vehicles_col_header",[]):
+            if final_entry_for_non_data.get("vehicle") and final_entry_for_non_data.get("vehicle").upper() in base_header_details.header_meta.get("excluded_vehicles_col_header",[]):
                 final_entry_for_non_data["vehicle"] = None
             results.append(final_entry_for_non_data)
         return results
 
-    all_segments_from_cell_lines = []
-    cell_lines = cell_text_cleaned_orig_case.splitlines() if '\n' in cell_text_cleaned_orig_case else [cell_text_cleaned_orig_case]
-
-    for line_idx, line_text_orig in enumerate(cell_lines):
-        line_text_orig_stripped = line_text_orig.strip()
-        if not line_text_orig_stripped: continue
-        
-        current_line_segments = []
-        po_matches = [{'value': m.group(1), 'start': m.start(), 'end': m.end()} for m in re.finditer(explicit_percent_regex_str, line_text_orig_stripped)]
-        
-        last_po_end_on_line = 0 
-        if not po_matches:
-            current_line_segments.append({"po_percent": None, "associated_text": line_text_orig_stripped, "is_condition_line": True})
-        else:
-            for i, current_po_match in enumerate(po_matches):
-                po_value = current_po_match['value']
-                po_start = current_po_match['start']
-                po_end = current_po_match['end']
-
-                text_before_this_po = line_text_orig_stripped[last_po_end_on_line:po_start].strip()
-                
-                context_window_end_for_this_po = len(line_text_orig_stripped)
-                if i + 1 < len(po_matches):
-                    next_po_start_on_line = po_matches[i+1]['start'] 
-                    context_window_end_for_this_po = next_po_start_on_line
-                
-                text_immediately_after_po = line_text_orig_stripped[po_end:context_window_end_for_this_po].strip()
-                
-                assoc_text_for_segment = text_before_this_po 
-                
-                first_chunk_after_po = text_immediately_after_po.split(",")[0].strip()
-                if (not text_before_this_po or re.fullmatch(r"[,\s]*", text_before_this_po)) or \
-                   PLAN_TYPE_REGEX.search(first_chunk_after_po.upper()):
-                    assoc_text_for_segment = first_chunk_after_po
-
-                if not assoc_text_for_segment.strip() and text_before_this_po.strip():
-                    assoc_text_for_segment = text_before_this_po
-
-                current_line_segments.append({"po_percent": po_value, "associated_text": assoc_text_for_segment})
-                
-                last_po_end_on_line = po_end 
-                if assoc_text_for_segment == first_chunk_after_po and text_immediately_after_po:
-                    consumed_text_len = len(first_chunk_after_po)
-                    if text_immediately_after_po.startswith(first_chunk_after_po + ","):
-                         last_po_end_on_line += 1 
-                    last_po_end_on_line += consumed_text_len
-
-
-            remaining_text_at_line_end = line_text_orig_stripped[last_po_end_on_line:].strip()
-            if remaining_text_at_line_end:
-                current_line_segments.append({"po_percent": None, "associated_text": remaining_text_at_line_end, "is_condition_line": True})
-        
-        all_segments_from_cell_lines.extend(current_line_segments)
-
-
-    if not any(s.get("po_percent") for s in all_segments_from_cell_lines) and cell_text_cleaned_orig_case:
-        single_po = extract_explicit_percentage(cell_text_cleaned_orig_case)
-        if single_po:
-             assoc_text_for_single_po = cell_text_cleaned_orig_case.replace(single_po, "", 1).strip()
-             if len(all_segments_from_cell_lines) == 1 and all_segments_from_cell_lines[0].get("is_condition_line"):
-                 all_segments_from_cell_lines = [{"po_percent": single_po, "associated_text": assoc_text_for_single_po}]
-             elif not all_segments_from_cell_lines: 
-                 all_segments_from_cell_lines.append({"po_percent": single_po, "associated_text": assoc_text_for_single_po})
-        elif cell_text_cleaned_orig_case and not all_segments_from_cell_lines :
-             all_segments_from_cell_lines = [{"po_percent": None, "associated_text": cell_text_cleaned_orig_case, "is_condition_line": True}]
-
-
-    general_conditions_from_cell = {}
+    all_segments_from_cell_lines, general_conditions_from_cell, cell_is_tata_only_special_case = analyze_cell_text(cell_text_cleaned_orig_case)
     final_percent_segments_to_process = []
-    cell_is_tata_only_special_case = "TATA" in cell_text_cleaned_upper and "ONLY" in cell_text_cleaned_upper
-
-    for seg_idx_pre, seg_pre in enumerate(all_segments_from_cell_lines):
-        if seg_pre.get("is_condition_line"):
-            cond_text_upper = seg_pre["associated_text"].upper()
-            if not general_conditions_from_cell.get("age_cond"):
-                for age_p, age_r in AGE_KEYWORD_PATTERNS:
-                    age_m = age_p.search(cond_text_upper)
-                    if age_m: general_conditions_from_cell["age_cond"] = age_r(age_m) if callable(age_r) else age_r; break
-            if "TATA" in cond_text_upper and "ONLY" in cond_text_upper:
-                 general_conditions_from_cell["bike_make_cond"] = "TATA"
-            elif not general_conditions_from_cell.get("bike_make_cond"):
-                bm_cond_tuple = BIKE_MAKE_REGEX.findall(cond_text_upper)
-                if bm_cond_tuple: general_conditions_from_cell["bike_make_cond"] = (bm_cond_tuple[0] if isinstance(bm_cond_tuple[0], str) else bm_cond_tuple[0][0]).upper()
-            
-            if not general_conditions_from_cell.get("plan_type_cond"):
-                plan_type_match_cond = PLAN_TYPE_REGEX.search(cond_text_upper)
-                if plan_type_match_cond:
-                    general_conditions_from_cell["plan_type_cond"] = PLAN_TYPE_KEYWORDS.get(plan_type_match_cond.group(1).upper())
-
-
-            if not general_conditions_from_cell.get("cluster_code_cond"):
-                 found_scc_in_cond = find_special_cluster_in_text(cond_text_upper, is_for_override=True)
-                 if found_scc_in_cond:
-                     general_conditions_from_cell["cluster_code_cond"] = found_scc_in_cond
-            if seg_pre["associated_text"]:
-                 current_cond_remarks = general_conditions_from_cell.get("cond_line_remark_list", [])
-                 if seg_pre["associated_text"] not in current_cond_remarks : 
-                    current_cond_remarks.append(seg_pre["associated_text"])
-                 general_conditions_from_cell["cond_line_remark_list"] = current_cond_remarks
-        elif seg_pre.get("po_percent"):
-            if seg_pre.get("po_percent", "").upper().replace("%", "") in [r.upper().replace("RTO","").strip().replace("RTOS","").strip() for r in SPECIAL_CLUSTER_CODES + [rto_cluster_from_row]]:
-                continue
-            final_percent_segments_to_process.append(seg_pre)
-    
+    for seg_pre in all_segments_from_cell_lines:
+        if seg_pre.get("is_condition_line") or not seg_pre.get("po_percent"): continue
+        po_digits = seg_pre["po_percent"].upper().replace("%", "")
+        if po_digits in SPECIAL_CLUSTER_CODE_DIGITS or po_digits == cluster_code_digits(rto_cluster_from_row):
+            continue
+        final_percent_segments_to_process.append(seg_pre)
+
     if not final_percent_segments_to_process and general_conditions_from_cell:
         meaningful_general_condition_exists = False
         if any(k not in ['cond_line_remark_list'] for k in general_conditions_from_cell):
@@ -544,8 +1243,7 @@ def parse_percentage_cell_text(cell_text_original, base_header_details, rto_clus
                 meaningful_general_condition_exists = True
         
         if meaningful_general_condition_exists:
-            final_percent_segments_to_process.append({"po_percent": "", "associated_text": ""})
-
+            final_percent_segments_to_process.append({"po_percent": "", "associated_text": "", "facts": segment_keyword_facts("")})
 
     for seg_idx, seg_data_final in enumerate(final_percent_segments_to_process):
         current_details_for_segment = base_header_details.copy()
@@ -571,10 +1269,10 @@ def parse_percentage_cell_text(cell_text_original, base_header_details, rto_clus
 
         current_details_for_segment["po_percent"] = seg_data_final["po_percent"]
         associated_text_segment_orig = seg_data_final["associated_text"]
-        associated_text_segment_upper = associated_text_segment_orig.upper()
+        segment_facts = seg_data_final["facts"]
         
         current_remarks_list_for_segment = []
-        if base_header_details.get("remarks_col_header"): current_remarks_list_for_segment.append(base_header_details.get("remarks_col_header"))
+        if base_header_details.header_meta.get("remarks_col_header"): current_remarks_list_for_segment.append(base_header_details.header_meta.get("remarks_col_header"))
         if main_table_context_global and main_table_context_global.get("remarks_main"):
             current_remarks_list_for_segment.extend(main_table_context_global.get("remarks_main"))
         if general_conditions_from_cell.get("cond_line_remark_list"):
@@ -585,36 +1283,25 @@ def parse_percentage_cell_text(cell_text_original, base_header_details, rto_clus
 
         # 4. Specific conditions from segment's associated text (e.g., ">5 yrs" with "55%") - OVERRIDES previous
         age_explicitly_set_by_segment = False
-        for age_pattern_idx, (age_pattern_re, age_val_resolver) in enumerate(AGE_KEYWORD_PATTERNS):
-            age_match_seg = age_pattern_re.search(associated_text_segment_upper)
-            if age_match_seg:
-                resolved_age = age_val_resolver(age_match_seg) if callable(age_val_resolver) else age_val_resolver
-                if resolved_age is not None and resolved_age != "":
-                    current_details_for_segment["age"] = resolved_age 
-                    age_explicitly_set_by_segment = True
-                break 
+        resolved_age = segment_facts["age"]
+        if resolved_age is not None and resolved_age != "":
+            current_details_for_segment["age"] = resolved_age
+            age_explicitly_set_by_segment = True
         
-        plan_type_match_seg = PLAN_TYPE_REGEX.search(associated_text_segment_upper) 
-        if plan_type_match_seg: 
-            current_details_for_segment["plan_type"] = PLAN_TYPE_KEYWORDS.get(plan_type_match_seg.group(1).upper())
+        if segment_facts["plan_type"] is not None:
+            current_details_for_segment["plan_type"] = segment_facts["plan_type"]
         
-        for pattern_et_seg in ENGINE_TYPE_REGEX_PATTERNS:
-            et_match_seg = pattern_et_seg.search(associated_text_segment_upper)
-            if et_match_seg: current_details_for_segment["engine_type"] = et_match_seg.group(0).upper().replace(" ",""); break
-        fuel_match_seg = FUEL_TYPE_REGEX.search(associated_text_segment_upper)
-        if fuel_match_seg: current_details_for_segment["fuel_type"] = (fuel_match_seg.group(1) if isinstance(fuel_match_seg.group(1), str) else fuel_match_seg.group(1)[0]).upper()
-        found_scc_in_segment = find_special_cluster_in_text(associated_text_segment_upper, is_for_override=True)
-        if found_scc_in_segment: current_details_for_segment["cluster_code"] = found_scc_in_segment
+        if segment_facts["engine_type"]: current_details_for_segment["engine_type"] = segment_facts["engine_type"]
+        if segment_facts["fuel_type"]: current_details_for_segment["fuel_type"] = segment_facts["fuel_type"]
+        if segment_facts["cluster_code"]: current_details_for_segment["cluster_code"] = segment_facts["cluster_code"]
 
         bike_makes_to_generate_rows_for_this_segment = []
-        segment_is_tata_only = "TATA" in associated_text_segment_upper and "ONLY" in associated_text_segment_upper
-        segment_makes_found = BIKE_MAKE_REGEX.findall(associated_text_segment_upper)
-        valid_segment_makes = [(bm[0] if isinstance(bm, tuple) else bm).upper() for bm in segment_makes_found
-                                if (bm[0] if isinstance(bm, tuple) else bm).upper() not in base_header_details.get("excluded_makes_col_header", [])]
+        segment_is_tata_only = segment_facts["tata_only"]
+        valid_segment_makes = [bm for bm in segment_facts["makes"] if bm not in base_header_details.header_meta.get("excluded_makes_col_header", [])]
 
         if cell_is_tata_only_special_case or segment_is_tata_only:
             bike_makes_to_generate_rows_for_this_segment = ["TATA"]
-        elif "OTHERS" in associated_text_segment_upper and not valid_segment_makes:
+        elif segment_facts["others"] and not valid_segment_makes:
             bike_makes_to_generate_rows_for_this_segment = [None]
         elif valid_segment_makes:
             bike_makes_to_generate_rows_for_this_segment = valid_segment_makes
@@ -622,10 +1309,10 @@ def parse_percentage_cell_text(cell_text_original, base_header_details, rto_clus
             bike_makes_to_generate_rows_for_this_segment = [general_conditions_from_cell.get("bike_make_cond")]
         # Apply main_table_context_global makes if they exist and no more specific make was determined
         elif main_table_context_global and main_table_context_global.get("bike_makes_main") and \
-             not (valid_segment_makes or general_conditions_from_cell.get("bike_make_cond") or base_header_details.get("header_bike_makes_list")):
+             not (valid_segment_makes or general_conditions_from_cell.get("bike_make_cond") or base_header_details.header_meta.get("header_bike_makes_list")):
             bike_makes_to_generate_rows_for_this_segment = main_table_context_global.get("bike_makes_main")
-        elif base_header_details.get("header_bike_makes_list"):
-            bike_makes_to_generate_rows_for_this_segment = base_header_details.get("header_bike_makes_list")
+        elif base_header_details.header_meta.get("header_bike_makes_list"):
+            bike_makes_to_generate_rows_for_this_segment = base_header_details.header_meta.get("header_bike_makes_list")
         else:
             bike_makes_to_generate_rows_for_this_segment = [None]
 
@@ -633,7 +1320,7 @@ def parse_percentage_cell_text(cell_text_original, base_header_details, rto_clus
         if not bike_makes_to_generate_rows_for_this_segment:
             bike_makes_to_generate_rows_for_this_segment = [None]
         
-        if current_details_for_segment.get("vehicle") and current_details_for_segment.get("vehicle").upper() in base_header_details.get("excluded_vehicles_col_header", []):
+        if current_details_for_segment.get("vehicle") and current_details_for_segment.get("vehicle").upper() in base_header_details.header_meta.get("excluded_vehicles_col_header", []):
             current_details_for_segment["vehicle"] = None
 
         for bm_to_apply in bike_makes_to_generate_rows_for_this_segment:
@@ -651,7 +1338,7 @@ def parse_percentage_cell_text(cell_text_original, base_header_details, rto_clus
 
             if (cell_is_tata_only_special_case or segment_is_tata_only) and final_entry.get("bike_make") != "TATA":
                 final_entry["bike_make"] = "TATA"
-            if final_entry.get("bike_make") and final_entry.get("bike_make") in base_header_details.get("excluded_makes_col_header",[]):
+            if final_entry.get("bike_make") and final_entry.get("bike_make") in base_header_details.header_meta.get("excluded_makes_col_header",[]):
                 final_entry["bike_make"] = None
 
             final_remarks_for_entry = current_remarks_list_for_segment[:]
@@ -673,26 +1360,413 @@ def parse_percentage_cell_text(cell_text_original, base_header_details, rto_clus
     return results
 
 
+def emit_simple_percentage_rows(po_percent, associated_text, base_header_details, rto_cluster_from_row, main_table_context_global):
+    # Rows for a cell holding nothing but one percentage, built straight from the
+    # header details. Equivalent to parse_percentage_cell_text's single-segment path
+    # when associated_text carries no keywords (empty, or the bare number itself).
+    po_digits = po_percent.upper().replace("%", "")
+    if po_digits in SPECIAL_CLUSTER_CODE_DIGITS or po_digits == cluster_code_digits(rto_cluster_from_row):
+        return []
+
+    is_table2_processing_target = main_table_context_global is not None and \
+                                  rto_cluster_from_row == "ANDAMAN&NICOBAR"
+    header_meta = base_header_details.header_meta
+    details = base_header_details.copy()
+    details["cluster_code"] = rto_cluster_from_row
+    main_context_bike_makes = None
+    remarks = [header_meta.get("remarks_col_header")]
+    if main_table_context_global:
+        if main_table_context_global.get("veh_type_main") is not None: details["veh_type"] = main_table_context_global.get("veh_type_main")
+        if main_table_context_global.get("age_main") is not None: details["age"] = main_table_context_global.get("age_main")
+        if main_table_context_global.get("plan_type_main") is not None: details["plan_type"] = main_table_context_global.get("plan_type_main")
+        if main_table_context_global.get("remarks_main"): remarks.extend(main_table_context_global.get("remarks_main"))
+        main_context_bike_makes = main_table_context_global.get("bike_makes_main")
+    details["po_percent"] = po_percent
+    remarks.append(associated_text)
+    details["remark"] = " | ".join(list(dict.fromkeys(filter(None, remarks)))).strip() or None
+
+    if details.get("vehicle") and details.get("vehicle").upper() in header_meta.get("excluded_vehicles_col_header", []):
+        details["vehicle"] = None
+
+    if main_context_bike_makes and not header_meta.get("header_bike_makes_list"):
+        bike_makes = main_context_bike_makes
+    else:
+        bike_makes = header_meta.get("header_bike_makes_list") or [None]
+
+    results = []
+    excluded_makes = header_meta.get("excluded_makes_col_header", [])
+    for bm_to_apply in bike_makes:
+        final_entry = details.copy()
+        if bm_to_apply is not None:
+            final_entry["bike_make"] = bm_to_apply
+        elif not main_context_bike_makes:
+            final_entry["bike_make"] = None
+        if final_entry.get("bike_make") and final_entry.get("bike_make") in excluded_makes:
+            final_entry["bike_make"] = None
+        results.append(final_entry)
+        if is_table2_processing_target:
+            print(f"DETAILED DEBUG (TABLE 2 ANDAMAN) (simple) Appended final entry: {final_entry} (bm_to_apply: {bm_to_apply})")
+    return results
+
+# Cells that are nothing but one percentage ("15%") or a bare number ("15", "0.15")
+# are the bulk of every grid and never need the segmentation loop. Every cell gets
+# one tag: "numeric" (native number), "empty", "non_data" (DECLINE / NO BUSINESS /
+# #REF! ...), "single_percent" (lone "15%" or bare number string), "multi_percent"
+# (2+ percent tokens), "complex" (one percent token plus text) or "condition_only"
+# (text with no percent token). Only numeric and single_percent skip the parser.
+SINGLE_PERCENT_CELL_REGEX_STR = r"\d+(?:\.\d+)?%?"
+SINGLE_PERCENT_CELL_REGEX = re.compile(SINGLE_PERCENT_CELL_REGEX_STR)
+PERCENT_TOKEN_REGEX_STR = r"\d+(?:\.\d+)?%"
+PERCENT_TOKEN_REGEX = re.compile(PERCENT_TOKEN_REGEX_STR)
+NON_DATA_CELL_VALUES = ["DECLINE", "NO BUSINESS", "CC", "NO BIZ", "#REF!", "TBD", "IRDA"]
+FAST_PATH_CELL_TAGS = ("numeric", "single_percent")
+
+def classify_cell_value(cell_value):
+    # Scalar form of classify_cell_block: returns (cell_tag, cleaned_cell_text).
+    if format_numeric_percentage(cell_value) is not None:
+        return "numeric", None
+    cell_text = clean_text_general(str(cell_value))
+    if not cell_text:
+        return "empty", cell_text
+    if cell_text.upper() in NON_DATA_CELL_VALUES:
+        return "non_data", cell_text
+    if SINGLE_PERCENT_CELL_REGEX.fullmatch(cell_text):
+        return "single_percent", cell_text
+    percent_token_count = len(PERCENT_TOKEN_REGEX.findall(cell_text))
+    if percent_token_count >= 2:
+        return "multi_percent", cell_text
+    return ("complex" if percent_token_count == 1 else "condition_only"), cell_text
+
+def classify_cell_block(cell_block):
+    # Tags a whole table's cell block with a handful of vectorized pandas calls.
+    # Returns (cell_tags, percent_token_counts, cleaned_cell_texts), each shaped
+    # like cell_block; tags match classify_cell_value cell for cell. Grid cells
+    # repeat heavily ("CC", "Decline", the same conditions down a column), so the
+    # text checks run once per distinct str() value and are broadcast back.
+    shape = cell_block.shape
+    values = pd.Series(cell_block.to_numpy(dtype=object).ravel(), dtype=object)
+    cell_tags = np.full(len(values), "numeric", dtype=object)
+    percent_token_counts = np.zeros(len(values), dtype=np.int64)
+    cell_texts = np.full(len(values), None, dtype=object)
+    if values.empty:
+        return cell_tags.reshape(shape), percent_token_counts.reshape(shape), cell_texts.reshape(shape)
+
+    value_types = values.map(type)
+    is_float = value_types.isin([float, np.float64]).to_numpy()
+    numbers_only = pd.to_numeric(values.where(value_types.isin([int, float, np.int64, np.float64])), errors="coerce").to_numpy(dtype=float)
+    with np.errstate(invalid="ignore"):
+        is_numeric = np.isfinite(numbers_only) & (numbers_only >= 0) & \
+                     ~(is_float & ((numbers_only >= 1e16) | ((numbers_only > 0) & (numbers_only < 1e-4))))
+
+    is_text = ~is_numeric
+    text_codes, distinct_texts = pd.factorize(values[is_text].map(str))
+    # pandas takes these patterns as strings, so --regex-stats times each call
+    # under a named counter (one evaluation per distinct text).
+    started = time.perf_counter()
+    collapsed = pd.Series(distinct_texts, dtype=object).str.replace(WHITESPACE_RUN_REGEX_STR, " ", regex=True)
+    record_vectorized_regex("WHITESPACE_RUN_REGEX_STR (str.replace)", started, len(distinct_texts),
+                            lambda: int(pd.Series(distinct_texts, dtype=object).str.contains(WHITESPACE_RUN_REGEX_STR, regex=True).sum()))
+    cleaned = collapsed.str.strip()
+    started = time.perf_counter()
+    distinct_counts = cleaned.str.count(PERCENT_TOKEN_REGEX_STR).to_numpy()
+    record_vectorized_regex("PERCENT_TOKEN_REGEX_STR (str.count)", started, len(cleaned), lambda: int((distinct_counts > 0).sum()))
+    started = time.perf_counter()
+    is_single_percent = cleaned.str.fullmatch(SINGLE_PERCENT_CELL_REGEX_STR).to_numpy(dtype=bool)
+    record_vectorized_regex("SINGLE_PERCENT_CELL_REGEX_STR (str.fullmatch)", started, len(cleaned), lambda: int(is_single_percent.sum()))
+    distinct_tags = np.select(
+        [(cleaned == "").to_numpy(),
+         cleaned.str.upper().isin(NON_DATA_CELL_VALUES).to_numpy(),
+         is_single_percent,
+         distinct_counts >= 2,
+         distinct_counts == 1],
+        ["empty", "non_data", "single_percent", "multi_percent", "complex"],
+        default="condition_only").astype(object)
+
+    cell_tags[is_text] = distinct_tags[text_codes]
+    percent_token_counts[is_text] = distinct_counts[text_codes]
+    cell_texts[is_text] = cleaned.to_numpy(dtype=object)[text_codes]
+    return cell_tags.reshape(shape), percent_token_counts.reshape(shape), cell_texts.reshape(shape)
+
+def fast_path_percentage(cell_tag, cell_value, cell_text):
+    # (po_percent, associated_text) for a numeric / single_percent cell, matching
+    # what parse_percentage_cell_text derives for the same cell.
+    if cell_tag == "numeric":
+        return format_numeric_percentage(cell_value), str(cell_value)
+    if cell_text.endswith("%"):
+        return cell_text, ""
+    po_percent = extract_explicit_percentage(cell_text)
+    return po_percent, cell_text.replace(po_percent, "", 1).strip()
+
+def parse_classified_cell(cell_tag, cell_text, cell_value, base_header_details, rto_cluster_from_row, main_table_context_global):
+    if cell_tag in FAST_PATH_CELL_TAGS:
+        po_percent, associated_text = fast_path_percentage(cell_tag, cell_value, cell_text)
+        return emit_simple_percentage_rows(po_percent, associated_text, base_header_details, rto_cluster_from_row, main_table_context_global)
+    return parse_percentage_cell_text(str(cell_value), base_header_details, rto_cluster_from_row, main_table_context_global)
+
+def parse_cell_value(cell_value, base_header_details, rto_cluster_from_row, main_table_context_global):
+    cell_tag, cell_text = classify_cell_value(cell_value)
+    return parse_classified_cell(cell_tag, cell_text, cell_value, base_header_details, rto_cluster_from_row, main_table_context_global)
+
+
 # --- process_sheet and main function (largely as provided, ensure they call updated parsers) ---
-def process_sheet(df_sheet, sheet_name):
-    all_rows_for_sheet = []
-    slab_month = extract_slab_month_from_df(df_sheet)
+def build_header_plan(df_sheet, header_row_idx, col_indices, slab_month, table_label, merge_map=None):
+    # Parses each column header of a table once. Every plan entry holds the column
+    # index, its header text and one base row per header vehicle x fuel expansion;
+    # the base rows are shared read-only by every cell in that column. A header
+    # cell covered by a merged range takes the text of the range's anchor cell.
+    header_plan = []
+    for j_col_idx in col_indices:
+        if j_col_idx >= len(df_sheet.columns): break
+        col_header_text_orig = df_sheet.iloc[header_row_idx, j_col_idx]
+        if merge_map:
+            owner_row, owner_col = merge_map.owner(header_row_idx, j_col_idx)
+            if (owner_row, owner_col) != (header_row_idx, j_col_idx) and owner_row < len(df_sheet) and owner_col < df_sheet.shape[1]:
+                col_header_text_orig = df_sheet.iloc[owner_row, owner_col]
+        if pd.isna(col_header_text_orig) or clean_text_general(str(col_header_text_orig)) == "": continue
+
+        base_details = parse_column_header_text(str(col_header_text_orig))
+        base_details["slab_month"] = slab_month
+        base_details.header_meta["table_label"] = table_label
+
+        fuel_types_from_header = base_details.header_meta.get("found_fuel_types_col_header", [])
+        if not fuel_types_from_header: fuel_types_from_header = [base_details.get("fuel_type")]
+
+        specific_vehicles_from_header = base_details.header_meta.get("header_specific_vehicles_list", [])
+        if not specific_vehicles_from_header: specific_vehicles_from_header = [base_details.get("vehicle")]
+
+        expanded_base_rows = []
+        for spec_veh in specific_vehicles_from_header:
+            for ft in fuel_types_from_header:
+                current_base_details_for_iter = base_details.copy()
+                if spec_veh: current_base_details_for_iter["vehicle"] = spec_veh
+                if ft: current_base_details_for_iter["fuel_type"] = ft
+                expanded_base_rows.append(current_base_details_for_iter)
+        header_plan.append((j_col_idx, col_header_text_orig, expanded_base_rows))
+    return header_plan
+
+def find_table_end_row(df_sheet, header_row_idx, rto_cluster_col_idx, end_row):
+    # A table's data rows run until the RTO cluster column goes blank or repeats
+    # the "RTO CLUSTER" header.
+    for i_row in range(header_row_idx + 1, min(end_row, len(df_sheet))):
+        rto_cluster_val_cleaned = clean_text_general(df_sheet.iloc[i_row, rto_cluster_col_idx])
+        if not rto_cluster_val_cleaned or "RTO CLUSTER" in rto_cluster_val_cleaned.upper():
+            return i_row
+    return min(end_row, len(df_sheet))
+
+def iter_table_rows(df_sheet, header_row_idx, rto_cluster_col_idx, end_row, header_plan, main_table_context, table_number, cell_path_counts):
+    table_end_row = find_table_end_row(df_sheet, header_row_idx, rto_cluster_col_idx, end_row)
+    row_entries = table_row_entries(df_sheet, header_row_idx, rto_cluster_col_idx, table_end_row, header_plan)
+
+    if PARALLEL_TABLE_WORKERS > 1 and len(row_entries) * len(header_plan) >= PARALLEL_TABLE_MIN_CELLS:
+        yield from iter_table_rows_parallel(row_entries, header_plan, main_table_context, table_number, cell_path_counts, PARALLEL_TABLE_WORKERS)
+    else:
+        yield from iter_row_entry_rows(row_entries, header_plan, main_table_context, table_number, cell_path_counts)
+
+def table_row_entries(df_sheet, header_row_idx, rto_cluster_col_idx, table_end_row, header_plan):
+    # One (rto_cluster_value, cell_tags, cell_texts, cell_values) per data row of
+    # the table, the last three in header_plan column order.
+    plan_col_indices = [j_col_idx for j_col_idx, _, _ in header_plan]
+    cell_block = df_sheet.iloc[header_row_idx + 1:table_end_row, plan_col_indices]
+    cell_tags, _, cell_texts = classify_cell_block(cell_block)
+    cell_values = cell_block.to_numpy(dtype=object)
+    rto_cluster_values = df_sheet.iloc[header_row_idx + 1:table_end_row, rto_cluster_col_idx].to_numpy(dtype=object)
+    return list(zip(rto_cluster_values, cell_tags, cell_texts, cell_values))
+
+def iter_row_entry_rows(row_entries, header_plan, main_table_context, table_number, cell_path_counts):
+    # row_entries as built by table_row_entries.
+    for rto_cluster_val_orig, row_cell_tags, row_cell_texts, row_cell_values in row_entries:
+        rto_cluster_val_str = str(rto_cluster_val_orig)
+
+        for block_col_idx, (j_col_idx, col_header_text_orig, expanded_base_rows) in enumerate(header_plan):
+            cell_value_orig = row_cell_values[block_col_idx]
+            cell_tag = row_cell_tags[block_col_idx]
+            cell_text = row_cell_texts[block_col_idx]
+            cell_path_counts[cell_tag] += 1
+            for base_details_for_iter in expanded_base_rows:
+                if table_number == 2 and rto_cluster_val_orig == "ANDAMAN&NICOBAR":
+                     print(f"DETAILED DEBUG: process_sheet (Table 2): Passing to parse_percentage_cell_text for RTO '{rto_cluster_val_orig}', ColHeader '{col_header_text_orig}', CellValue '{cell_value_orig}' with main_table2_context: {main_table_context}") # KEEP
+                yield from parse_classified_cell(cell_tag, cell_text, cell_value_orig, base_details_for_iter, rto_cluster_val_str, main_table_context)
+
+# Relative parse cost of a cell, used only to balance parallel row chunks.
+# Fast-path, empty and non-data cells are near free; a text cell goes through the
+# lexer and the segment loop, so it pays for its length, each percentage (one
+# segment each), each extra line and each keyword the lexer has to resolve.
+# Weights are in fast-path cell units (about 10us warm), fitted against per-cell
+# timings of the sample grids.
+CELL_COST_FAST_PATH = 1.0
+CELL_COST_TEXT = 3.0
+CELL_COST_PER_CHAR = 0.1
+CELL_COST_PER_PERCENT = 0.5
+CELL_COST_PER_LINE = 2.0
+CELL_COST_PER_KEYWORD = 1.0
+CHEAP_CELL_TAGS = FAST_PATH_CELL_TAGS + ("empty", "non_data")
+CELL_COST_WORD_REGEX = re.compile(r"[^\W\d]+")
+
+def estimate_cell_cost(cell_tag, cell_value):
+    if cell_tag in CHEAP_CELL_TAGS:
+        return CELL_COST_FAST_PATH
+    cell_text = str(cell_value)
+    keyword_phrases = cell_keyword_phrases()
+    keyword_hits = sum(1 for word in CELL_COST_WORD_REGEX.findall(cell_text.upper()) if word in keyword_phrases or word in CELL_WORD_KINDS)
+    return (CELL_COST_TEXT + CELL_COST_PER_CHAR * len(cell_text)
+            + CELL_COST_PER_PERCENT * len(PERCENT_TOKEN_REGEX.findall(cell_text))
+            + CELL_COST_PER_LINE * cell_text.count("\n")
+            + CELL_COST_PER_KEYWORD * keyword_hits)
+
+def estimate_row_costs(row_entries, header_plan):
+    # One estimate per table row: its cells' costs, each times the number of base
+    # rows (header vehicle x fuel expansions) that parse the cell. Grid texts repeat
+    # down a table, so each distinct text is costed once.
+    base_row_counts = [len(expanded_base_rows) for _, _, expanded_base_rows in header_plan]
+    text_costs = {}
+    row_costs = []
+    for _, row_cell_tags, _, row_cell_values in row_entries:
+        row_cost = 0.0
+        for cell_tag, cell_value, base_row_count in zip(row_cell_tags, row_cell_values, base_row_counts):
+            if cell_tag in CHEAP_CELL_TAGS:
+                cell_cost = CELL_COST_FAST_PATH
+            else:
+                text_key = str(cell_value)
+                cell_cost = text_costs.get(text_key)
+                if cell_cost is None:
+                    cell_cost = text_costs[text_key] = estimate_cell_cost(cell_tag, cell_value)
+            row_cost += cell_cost * base_row_count
+        row_costs.append(row_cost)
+    return row_costs
+
+def partition_rows_evenly(row_count, chunk_count):
+    # (start, end) row ranges of equal length.
+    chunk_row_count = max(1, math.ceil(row_count / chunk_count))
+    return [(start, min(start + chunk_row_count, row_count)) for start in range(0, row_count, chunk_row_count)]
+
+def partition_rows_by_cost(row_costs, chunk_count):
+    # (start, end) row ranges of about equal estimated cost: cut where the running
+    # cost crosses each multiple of total / chunk_count. Ranges stay contiguous so
+    # chunk results can still be yielded in table order as they arrive.
+    total_cost = sum(row_costs)
+    if total_cost <= 0:
+        return partition_rows_evenly(len(row_costs), chunk_count)
+    cumulative_costs = list(itertools.accumulate(row_costs))
+    cuts = {0, len(row_costs)}
+    for chunk_idx in range(1, chunk_count):
+        cuts.add(min(len(row_costs), bisect.bisect_left(cumulative_costs, total_cost * chunk_idx / chunk_count) + 1))
+    cuts = sorted(cuts)
+    return list(zip(cuts, cuts[1:]))
+
+# Worker side of iter_table_rows_parallel. The header plan and table context are
+# shipped once per worker through the pool initializer; each task is then just a
+# chunk of row entries. Rows come back as (plan column, values) and are re-attached
+# to the parent's header_meta, which every row of a plan column shares.
+TABLE_WORKER_STATE = None
+
+def init_table_worker(header_plan, main_table_context, table_number, count_regexes=False):
+    # count_regexes (--regex-stats): instrument this worker's patterns too; counts
+    # start from zero (a forked worker inherits the parent's) and go back with
+    # each chunk for the parent to merge.
+    global TABLE_WORKER_STATE
+    if count_regexes:
+        enable_regex_counters()
+        take_regex_counts()
+    header_meta_columns = {id(expanded_base_rows[0].header_meta): block_col_idx
+                           for block_col_idx, (_, _, expanded_base_rows) in enumerate(header_plan) if expanded_base_rows}
+    TABLE_WORKER_STATE = (header_plan, main_table_context, table_number, header_meta_columns)
+
+def parse_table_row_chunk(row_entries):
+    header_plan, main_table_context, table_number, header_meta_columns = TABLE_WORKER_STATE
+    started_cpu = time.process_time()
+    cell_path_counts = defaultdict(int)
+    parsed_rows = [(header_meta_columns[id(row.header_meta)], row.values)
+                   for row in iter_row_entry_rows(row_entries, header_plan, main_table_context, table_number, cell_path_counts)]
+    return parsed_rows, dict(cell_path_counts), os.getpid(), time.process_time() - started_cpu, take_regex_counts()
+
+# Figures of the last parallel table: row ranges and estimated cost per chunk, CPU
+# seconds per worker (benchmarks/bench_table_parallel.py reads them).
+LAST_PARALLEL_TABLE_STATS = None
+
+def iter_table_rows_parallel(row_entries, header_plan, main_table_context, table_number, cell_path_counts, workers):
+    # Same rows in the same order as iter_row_entry_rows, parsed in row chunks on
+    # a process pool; chunk results are yielded in chunk order as they complete.
+    global LAST_PARALLEL_TABLE_STATS
+    from concurrent.futures import ProcessPoolExecutor
+    chunk_count = workers * PARALLEL_TABLE_CHUNKS_PER_WORKER
+    row_costs = estimate_row_costs(row_entries, header_plan)
+    if PARALLEL_TABLE_PARTITION == "cost":
+        row_ranges = partition_rows_by_cost(row_costs, chunk_count)
+    else:
+        row_ranges = partition_rows_evenly(len(row_entries), chunk_count)
+    chunk_costs = [sum(row_costs[start:end]) for start, end in row_ranges]
+    header_metas = [expanded_base_rows[0].header_meta if expanded_base_rows else None for _, _, expanded_base_rows in header_plan]
+    print(f"INFO: parallel: Table {table_number}: {len(row_entries)} rows x {len(header_plan)} columns in {len(row_ranges)} "
+          f"{PARALLEL_TABLE_PARTITION} chunks on {workers} workers (estimated chunk cost max/mean {max(chunk_costs) * len(chunk_costs) / max(1.0, sum(chunk_costs)):.2f})")
+    worker_cpu_seconds = defaultdict(float)
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=init_table_worker,
+                               initargs=(header_plan, main_table_context, table_number, REGEX_COUNTERS is not None))
+    try:
+        row_chunks = (row_entries[start:end] for start, end in row_ranges)
+        for parsed_rows, chunk_cell_path_counts, worker_pid, cpu_seconds, regex_counts in pool.map(parse_table_row_chunk, row_chunks):
+            worker_cpu_seconds[worker_pid] += cpu_seconds
+            merge_regex_counts(regex_counts)
+            for cell_tag, count in chunk_cell_path_counts.items():
+                cell_path_counts[cell_tag] += count
+            for block_col_idx, values in parsed_rows:
+                yield OutputRow(values, header_metas[block_col_idx])
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    busy_seconds = sorted(worker_cpu_seconds.values(), reverse=True)
+    busy_seconds += [0.0] * (workers - len(busy_seconds))
+    cpu_balance = sum(busy_seconds) / (workers * busy_seconds[0]) if busy_seconds[0] else 1.0
+    print(f"INFO: parallel: Table {table_number}: worker CPU seconds {', '.join(f'{seconds:.2f}' for seconds in busy_seconds)} (balance {cpu_balance:.1%})")
+    LAST_PARALLEL_TABLE_STATS = {"table_number": table_number, "partition": PARALLEL_TABLE_PARTITION, "workers": workers,
+                                 "row_ranges": row_ranges, "chunk_costs": chunk_costs,
+                                 "worker_cpu_seconds": busy_seconds, "cpu_balance": cpu_balance}
+
+def is_table_title_text(cell_text_title_upper):
+    return "GRID" in cell_text_title_upper and ("MHCV" in cell_text_title_upper or "LCV" in cell_text_title_upper or "AOTP" in cell_text_title_upper or "TATA & AL ONLY" in cell_text_title_upper or "TATA & AL" in cell_text_title_upper)
+
+def find_table_title(df_sheet, header_row_idx, rto_cluster_col_idx, merge_map=None):
+    # A table title ("MHCV-AOTP GRID (> 5 Years, TATA & AL only)") sits up to five
+    # rows above the header, near the RTO cluster column (or in column 1).
+    title_search_start_row = max(0, header_row_idx - 5)
+    scan_cols_indices_for_title = list(range(max(0, rto_cluster_col_idx - 5), min(len(df_sheet.columns), rto_cluster_col_idx + 5)))
+    if 1 not in scan_cols_indices_for_title and 1 < len(df_sheet.columns): scan_cols_indices_for_title.insert(0,1)
+    scan_cols_indices_for_title = sorted(list(set(scan_cols_indices_for_title)))
+
+    # Titles are normally merged banners whose text pandas leaves only in the
+    # top-left cell, so each covered cell is resolved to its anchor (O(1) per
+    # cell) while keeping the row-major first-match order of the plain scan.
+    for j_scan_title in range(title_search_start_row, header_row_idx):
+        for k_col_idx_title in scan_cols_indices_for_title:
+            if j_scan_title < len(df_sheet) and k_col_idx_title < df_sheet.shape[1]:
+                owner_row, owner_col = merge_map.owner(j_scan_title, k_col_idx_title) if merge_map else (j_scan_title, k_col_idx_title)
+                if owner_row >= len(df_sheet) or owner_col >= df_sheet.shape[1]:
+                    owner_row, owner_col = j_scan_title, k_col_idx_title
+                cell_val_title = df_sheet.iloc[owner_row, owner_col]
+                if is_table_title_text(clean_text_general(cell_val_title).upper()):
+                    return cell_val_title
+    return None
+
+def iter_sheet_rows(df_sheet, sheet_name, cell_path_counts=None, merge_map=None, slab_month=None, slab_month_resolved=False):
+    # slab_month_resolved: the caller already looked the month up for the whole
+    # workbook (resolve_slab_month), so a None there is final, not a reason to
+    # rescan this sheet's banner.
+    sheet_cell_path_counts = defaultdict(int)
+    if slab_month is None and not slab_month_resolved: slab_month = extract_slab_month_from_df(df_sheet)
     print(f"INFO: process_sheet: Processing sheet: {sheet_name}, Slab Month: {slab_month}")
 
     header_row_idx_t1 = find_header_row(df_sheet, "RTO CLUSTER")
     if header_row_idx_t1 is None:
         print(f"WARN: process_sheet: RTO CLUSTER header not found for Table 1 in sheet {sheet_name}. Skipping.")
-        return []
+        return
 
     try:
         rto_cluster_col_name_t1 = df_sheet.iloc[header_row_idx_t1][df_sheet.iloc[header_row_idx_t1].astype(str).str.upper().str.strip().str.contains("RTO CLUSTER", na=False)].index[0]
         rto_cluster_col_idx_t1 = df_sheet.columns.get_loc(rto_cluster_col_name_t1)
     except IndexError:
         print(f"CRITICAL: Could not find 'RTO CLUSTER' column index in identified header row {header_row_idx_t1} for sheet {sheet_name}. Skipping sheet.")
-        return []
+        return
     except KeyError:
         print(f"CRITICAL: Column name for 'RTO CLUSTER' not found in DataFrame columns for sheet {sheet_name}. Skipping sheet.")
-        return []
+        return
 
 
     header_row_idx_t2 = None
@@ -708,21 +1782,9 @@ def process_sheet(df_sheet, sheet_name):
                 rto_cluster_col_idx_t2 = df_sheet.columns.get_loc(rto_cluster_col_name_t2)
             except (IndexError, KeyError): header_row_idx_t2 = None; rto_cluster_col_idx_t2 = None; break
 
-            title_search_start_row_t2 = max(0, header_row_idx_t2 - 5)
-            for j_scan_title_t2 in range(title_search_start_row_t2, header_row_idx_t2):
-                scan_cols_indices_for_title_t2 = list(range(max(0, rto_cluster_col_idx_t2 - 5), min(len(df_sheet.columns), rto_cluster_col_idx_t2 + 5)))
-                if 1 not in scan_cols_indices_for_title_t2 and 1 < len(df_sheet.columns): scan_cols_indices_for_title_t2.insert(0,1)
-                scan_cols_indices_for_title_t2 = sorted(list(set(scan_cols_indices_for_title_t2)))
-
-
-                for k_col_idx_title_t2 in scan_cols_indices_for_title_t2:
-                    if j_scan_title_t2 < len(df_sheet) and k_col_idx_title_t2 < df_sheet.shape[1]:
-                        cell_val_title_t2 = df_sheet.iloc[j_scan_title_t2, k_col_idx_title_t2]
-                        cell_text_title_t2_upper = clean_text_general(cell_val_title_t2).upper()
-                        if "GRID" in cell_text_title_t2_upper and ("MHCV" in cell_text_title_t2_upper or "LCV" in cell_text_title_t2_upper or "AOTP" in cell_text_title_t2_upper or "TATA & AL ONLY" in cell_text_title_t2_upper or "TATA & AL" in cell_text_title_t2_upper) :
-                            main_table2_context = parse_main_table_header(str(cell_val_title_t2)) # KEEP
-                            break
-                if main_table2_context: break
+            cell_val_title_t2 = find_table_title(df_sheet, header_row_idx_t2, rto_cluster_col_idx_t2, merge_map)
+            if cell_val_title_t2 is not None:
+                main_table2_context = parse_main_table_header(str(cell_val_title_t2)) # KEEP
             break
 
     print(f"INFO: process_sheet: Processing Table 1 (Header row: {header_row_idx_t1}, RTO Col Index: {rto_cluster_col_idx_t1})")
@@ -730,112 +1792,975 @@ def process_sheet(df_sheet, sheet_name):
     end_col_idx_t1 = rto_cluster_col_idx_t2 if header_row_idx_t2 is not None and rto_cluster_col_idx_t2 is not None else len(df_sheet.columns)
 
 
-    for i_row_t1 in range(header_row_idx_t1 + 1, end_row_t1):
-        if i_row_t1 >= len(df_sheet): break
-        rto_cluster_val_t1_orig = df_sheet.iloc[i_row_t1, rto_cluster_col_idx_t1]
-        rto_cluster_val_t1_cleaned = clean_text_general(rto_cluster_val_t1_orig)
-        if not rto_cluster_val_t1_cleaned or "RTO CLUSTER" in rto_cluster_val_t1_cleaned.upper(): break
-
-        for j_col_idx_t1 in range(rto_cluster_col_idx_t1 + 1, end_col_idx_t1):
-            if j_col_idx_t1 >= len(df_sheet.columns): break
-            col_header_text_t1_orig = df_sheet.iloc[header_row_idx_t1, j_col_idx_t1]
-            if pd.isna(col_header_text_t1_orig) or clean_text_general(str(col_header_text_t1_orig)) == "": continue
-
-            base_details_t1 = parse_column_header_text(str(col_header_text_t1_orig))
-            base_details_t1["slab_month"] = slab_month
-
-            cell_value_t1_orig = df_sheet.iloc[i_row_t1, j_col_idx_t1]
-
-            fuel_types_from_header_t1 = base_details_t1.pop("found_fuel_types_col_header", [])
-            if not fuel_types_from_header_t1: fuel_types_from_header_t1 = [base_details_t1.get("fuel_type")]
-
-            specific_vehicles_from_header_t1 = base_details_t1.pop("header_specific_vehicles_list", [])
-            if not specific_vehicles_from_header_t1: specific_vehicles_from_header_t1 = [base_details_t1.get("vehicle")]
-
-            for spec_veh_t1 in specific_vehicles_from_header_t1:
-                for ft_t1 in fuel_types_from_header_t1:
-                    current_base_details_t1_for_iter = base_details_t1.copy()
-                    if spec_veh_t1: current_base_details_t1_for_iter["vehicle"] = spec_veh_t1
-                    if ft_t1: current_base_details_t1_for_iter["fuel_type"] = ft_t1
-                    parsed_rows_t1 = parse_percentage_cell_text(str(cell_value_t1_orig), current_base_details_t1_for_iter, str(rto_cluster_val_t1_orig), None)
-                    all_rows_for_sheet.extend(parsed_rows_t1)
+    header_plan_t1 = build_header_plan(df_sheet, header_row_idx_t1, range(rto_cluster_col_idx_t1 + 1, end_col_idx_t1), slab_month, f"{sheet_name} / Table 1", merge_map)
+    memory_checkpoint("detection")
+    yield from iter_table_rows(df_sheet, header_row_idx_t1, rto_cluster_col_idx_t1, end_row_t1, header_plan_t1, None, 1, sheet_cell_path_counts)
+    memory_checkpoint("cell parsing")
 
     if header_row_idx_t2 is not None and rto_cluster_col_idx_t2 is not None:
         print(f"INFO: process_sheet: Processing Table 2 (Header row: {header_row_idx_t2}, RTO Col Index: {rto_cluster_col_idx_t2}) with Main Context: {main_table2_context}") # KEEP
-        for i_row_t2 in range(header_row_idx_t2 + 1, len(df_sheet)):
-            if i_row_t2 >= len(df_sheet): break
-            rto_cluster_val_t2_orig = df_sheet.iloc[i_row_t2, rto_cluster_col_idx_t2]
-            rto_cluster_val_t2_cleaned = clean_text_general(rto_cluster_val_t2_orig)
-            if not rto_cluster_val_t2_cleaned or "RTO CLUSTER" in rto_cluster_val_t2_cleaned.upper(): break
-
-            for j_col_idx_t2 in range(rto_cluster_col_idx_t2 + 1, len(df_sheet.columns)):
-                if j_col_idx_t2 >= len(df_sheet.columns): break
-                col_header_text_t2_orig = df_sheet.iloc[header_row_idx_t2, j_col_idx_t2]
-                if pd.isna(col_header_text_t2_orig) or clean_text_general(str(col_header_text_t2_orig)) == "": continue
-
-                base_details_t2 = parse_column_header_text(str(col_header_text_t2_orig))
-                base_details_t2["slab_month"] = slab_month
-
-                cell_value_t2_orig = df_sheet.iloc[i_row_t2, j_col_idx_t2]
+        header_plan_t2 = build_header_plan(df_sheet, header_row_idx_t2, range(rto_cluster_col_idx_t2 + 1, len(df_sheet.columns)), slab_month, f"{sheet_name} / Table 2", merge_map)
+        memory_checkpoint("detection")
+        yield from iter_table_rows(df_sheet, header_row_idx_t2, rto_cluster_col_idx_t2, len(df_sheet), header_plan_t2, main_table2_context, 2, sheet_cell_path_counts)
+        memory_checkpoint("cell parsing")
+
+    total_cells = sum(sheet_cell_path_counts.values())
+    if total_cells:
+        path_summary = ", ".join(f"{kind}={count} ({count / total_cells:.1%})" for kind, count in sheet_cell_path_counts.items())
+        print(f"INFO: process_sheet: Cell parse paths for sheet {sheet_name}: {path_summary}")
+    if cell_path_counts is not None:
+        for kind, count in sheet_cell_path_counts.items():
+            cell_path_counts[kind] = cell_path_counts.get(kind, 0) + count
+
+def process_sheet(df_sheet, sheet_name, cell_path_counts=None, merge_map=None, slab_month=None):
+    return list(iter_sheet_rows(df_sheet, sheet_name, cell_path_counts, merge_map, slab_month))
+
+def iter_rows(workbook, sheet_names=None):
+    # Yields output rows table by table, cell by cell, for a workbook path or an
+    # open pd.ExcelFile. Only the first sheet is read unless sheet_names is given.
+    xls = workbook if isinstance(workbook, pd.ExcelFile) else pd.ExcelFile(workbook)
+    # An ExcelFile keeps what it was opened from (.io in older pandas, ._io now);
+    # the merge map and the file-name slab month need it to be a path.
+    workbook_path = workbook if not isinstance(workbook, pd.ExcelFile) else getattr(workbook, "io", getattr(workbook, "_io", None))
+    if not isinstance(workbook_path, (str, os.PathLike)):
+        workbook_path = None
+        print("WARN: Main: Workbook was opened from a buffer, not a path. Merged cells and the file-name slab month are not available.")
+    slab_month = None
+    slab_month_resolved = False
+    for sheet_name in (sheet_names or [xls.sheet_names[0]]):
+        print(f"INFO: Main: Reading sheet: {sheet_name}")
+        df_sheet_raw = pd.read_excel(xls, sheet_name=sheet_name, header=None, keep_default_na=False, na_filter=False)
+
+        if df_sheet_raw.empty or len(df_sheet_raw) < 3:
+            print(f"WARN: Main: Sheet '{sheet_name}' is empty or too small. Skipping.")
+            continue
+
+        if not slab_month_resolved:
+            slab_month = resolve_slab_month(workbook_path, xls.sheet_names, df_sheet_raw)
+            slab_month_resolved = True
+        merge_map = read_merge_map(workbook_path, sheet_name) if workbook_path is not None else None
+        memory_checkpoint("load")
+        yield from iter_sheet_rows(df_sheet_raw, sheet_name, merge_map=merge_map, slab_month=slab_month, slab_month_resolved=True)
+
+# --- Output Frame ---
+# Every output column repeats a small set of values (cluster codes, vehicle/make
+# keywords, the same remark strings thousands of times), so the frame is built as
+# pandas Categoricals: each distinct value is stored once and rows hold int codes.
+# pyarrow maps these to dictionary-encoded columns when the frame is written out.
+
+def build_output_frame(rows):
+    col_count = len(OUTPUT_COLUMNS)
+    value_codes = [{} for _ in range(col_count)]
+    codes = [array("i") for _ in range(col_count)]
+    for row in rows:
+        values = row.values
+        for idx in range(col_count):
+            value = values[idx]
+            if value is None:
+                codes[idx].append(-1)
+                continue
+            lookup = value_codes[idx]
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(lookup)
+            codes[idx].append(code)
+
+    columns = {}
+    for idx, col in enumerate(OUTPUT_COLUMNS):
+        columns[col] = pd.Categorical.from_codes(codes[idx], categories=list(value_codes[idx]))
+    return pd.DataFrame(columns, columns=OUTPUT_COLUMNS)
+
+def split_remark_lookup(output_df):
+    # Replaces the remark column with integer remark_id codes and returns the
+    # distinct remarks as a separate (remark_id, remark) lookup table.
+    remarks = output_df["remark"]
+    if not isinstance(remarks.dtype, pd.CategoricalDtype):
+        remarks = remarks.astype("category")
+    remark_lookup_df = pd.DataFrame({"remark_id": range(len(remarks.cat.categories)), "remark": remarks.cat.categories})
+    coded_df = output_df.drop(columns=["remark"])
+    coded_df.insert(OUTPUT_COLUMNS.index("remark"), "remark_id", remarks.cat.codes.astype("int32"))
+    return coded_df, remark_lookup_df
+
+class RowDeduplicator:
+    # Streaming exact-row dedup (--dedup): drops exact-duplicate output rows (e.g.
+    # vehicle x fuel expansion over identical cell templates) before the writer.
+    # Keeps a 12-byte blake2b fingerprint per distinct row instead of the rows
+    # themselves, and counts dropped repeats per table. Past
+    # max_fingerprints_in_memory the set spills to a temporary SQLite file in
+    # spill_dir (default: the system temp folder); None keeps it all in memory.
+    def __init__(self, max_fingerprints_in_memory=None, spill_dir=None):
+        self.fingerprints = set()
+        self.max_fingerprints_in_memory = max_fingerprints_in_memory
+        self.spill_dir = spill_dir
+        self.spill_path = None
+        self.spill_db = None
+        self.duplicates_by_table = defaultdict(int)
+        self.rows_by_table = defaultdict(int)
+
+    @staticmethod
+    def fingerprint(row):
+        canonical = "\x1f".join("\x1e" if v is None else str(v) for v in row.values)
+        return hashlib.blake2b(canonical.encode("utf-8"), digest_size=12).digest()
+
+    def _spill(self):
+        if self.spill_db is None:
+            fd, self.spill_path = tempfile.mkstemp(prefix="icici_dedup_", suffix=".sqlite", dir=self.spill_dir)
+            os.close(fd)
+            self.spill_db = sqlite3.connect(self.spill_path)
+            self.spill_db.execute("CREATE TABLE IF NOT EXISTS fingerprints (fp BLOB PRIMARY KEY) WITHOUT ROWID")
+        self.spill_db.executemany("INSERT OR IGNORE INTO fingerprints (fp) VALUES (?)", ((fp,) for fp in self.fingerprints))
+        self.spill_db.commit()
+        self.fingerprints.clear()
+
+    def seen(self, row):
+        # True if an identical row was seen before; otherwise records it.
+        fp = self.fingerprint(row)
+        if fp in self.fingerprints:
+            return True
+        if self.spill_db is not None and self.spill_db.execute("SELECT 1 FROM fingerprints WHERE fp = ?", (fp,)).fetchone():
+            return True
+        self.fingerprints.add(fp)
+        if self.max_fingerprints_in_memory and len(self.fingerprints) >= self.max_fingerprints_in_memory:
+            self._spill()
+        return False
+
+    def filter(self, rows):
+        for row in rows:
+            table_label = row.header_meta.get("table_label")
+            self.rows_by_table[table_label] += 1
+            if self.seen(row):
+                self.duplicates_by_table[table_label] += 1
+                continue
+            yield row
+
+    def report(self):
+        for table_label, row_count in self.rows_by_table.items():
+            print(f"INFO: RowDeduplicator: {table_label}: removed {self.duplicates_by_table.get(table_label, 0)} duplicate rows out of {row_count}")
+
+    def close(self):
+        if self.spill_db is not None:
+            self.spill_db.close()
+            self.spill_db = None
+        if self.spill_path is not None and os.path.exists(self.spill_path):
+            os.remove(self.spill_path)
+            self.spill_path = None
+
+def write_rows_streaming(rows, output_path):
+    # Writes rows as they are produced, without building a frame: csv module for
+    # .csv, openpyxl write-only mode (rows flushed to a temp file) for .xlsx.
+    row_count = 0
+    if os.path.splitext(output_path)[1].lower() == ".csv":
+        with open(output_path, "w", newline="", encoding="utf-8") as out_file:
+            writer = csv.writer(out_file)
+            writer.writerow(OUTPUT_COLUMNS)
+            for row in rows:
+                writer.writerow(["" if v is None else v for v in row.values])
+                row_count += 1
+    else:
+        from openpyxl import Workbook
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet("Sheet1")
+        worksheet.append(OUTPUT_COLUMNS)
+        for row in rows:
+            worksheet.append(row.values)
+            row_count += 1
+        workbook.save(output_path)
+    return row_count
+
+
+# --- Parquet Dataset Export ---
+# --parquet-dataset DIR also appends each processed grid to a hive-partitioned
+# Parquet dataset (DIR/slab_month=Mar25/part-<run id>.parquet), so cross-month
+# queries read only the partitions they filter on. Rows inside a file are sorted
+# by cluster_code, which keeps its per-row-group min/max statistics selective;
+# every column is dictionary-encoded (the output frame is all Categoricals).
+# The run id is the grid's content hash: reprocessing the same grid first removes
+# its earlier files, so the dataset never holds a grid twice. Needs pyarrow.
+PARQUET_DATASET_DIR = None
+PARQUET_PARTITION_COLUMNS = ["slab_month"]
+PARQUET_SORT_COLUMNS = ["cluster_code", "veh_type", "vehicle", "bike_make"]
+PARQUET_ROW_GROUP_SIZE = 64 * 1024
+PARQUET_NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+def parquet_available():
+    try:
+        import pyarrow.parquet  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def parquet_partition_dir(partition_columns, partition_values):
+    from urllib.parse import quote
+    return os.path.join(*(f"{col}={PARQUET_NULL_PARTITION if value is None else quote(str(value), safe='')}"
+                          for col, value in zip(partition_columns, partition_values)))
+
+def remove_parquet_run_files(dataset_dir, run_file_name):
+    removed = 0
+    for dir_path, _, file_names in os.walk(dataset_dir):
+        if run_file_name in file_names:
+            os.remove(os.path.join(dir_path, run_file_name))
+            removed += 1
+    return removed
+
+def write_parquet_dataset(output_df, dataset_dir, run_id, partition_columns=None):
+    # Returns the number of partition files written for this run.
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    partition_columns = list(partition_columns or PARQUET_PARTITION_COLUMNS)
+    run_file_name = f"part-{run_id}.parquet"
+    replaced = remove_parquet_run_files(dataset_dir, run_file_name)
+    data_columns = [col for col in OUTPUT_COLUMNS if col not in partition_columns]
+    sort_columns = [col for col in PARQUET_SORT_COLUMNS if col in data_columns]
+    # One fixed schema for every file, so runs whose column is all-empty (or whose
+    # dictionaries differ in size) still read back as a single dataset.
+    schema = pa.schema([(col, pa.dictionary(pa.int32(), pa.string())) for col in data_columns])
+    written = 0
+    for partition_values, partition_df in output_df.groupby(partition_columns, observed=True, dropna=False, sort=False):
+        if not isinstance(partition_values, tuple): partition_values = (partition_values,)
+        partition_values = [None if pd.isna(value) else value for value in partition_values]
+        partition_df = partition_df[data_columns]
+        if sort_columns:
+            partition_df = partition_df.sort_values(sort_columns, key=lambda column: column.astype(object).fillna("").astype(str), kind="stable")
+        table = pa.Table.from_pandas(partition_df, schema=schema, preserve_index=False)
+        partition_path = os.path.join(dataset_dir, parquet_partition_dir(partition_columns, partition_values))
+        os.makedirs(partition_path, exist_ok=True)
+        file_path = os.path.join(partition_path, run_file_name)
+        pq.write_table(table, file_path + ".tmp", row_group_size=PARQUET_ROW_GROUP_SIZE, use_dictionary=True, write_statistics=True)
+        os.replace(file_path + ".tmp", file_path)
+        written += 1
+    action = f"replaced {replaced} earlier file(s) of this grid, wrote" if replaced else "wrote"
+    print(f"INFO: parquet: {action} {written} partition file(s) for run {run_id} under {dataset_dir}")
+    return written
+
+
+# --- SQLite Export ---
+# --sqlite-db PATH also loads each processed grid into a local SQLite database for
+# lookup tools: payout_rows holds the output rows tagged with their run id, runs
+# holds one metadata row per grid. A run is replaced (delete + insert) in a single
+# transaction with executemany, so re-exporting a grid is idempotent and readers
+# never see half a month. The composite indexes serve the two lookup shapes:
+# a cluster/vehicle combination, and a month's rows for a cluster.
+# Remarks are long and repeat across thousands of rows, so payout_rows keeps a
+# remark_id into the remarks lookup table (split_remark_lookup, mapped onto ids
+# shared by every run); payout_rows_with_remarks joins the text back in.
+SQLITE_EXPORT_PATH = None
+# Stored as PRAGMA user_version; 2 is the remark_id layout (1 never set it, so a
+# payout_rows table at version 0 is the old remark TEXT layout).
+SQLITE_SCHEMA_VERSION = 2
+SQLITE_ROW_COLUMNS = ["remark_id" if col == "remark" else col for col in OUTPUT_COLUMNS]
+SQLITE_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS remarks (remark_id INTEGER PRIMARY KEY, remark TEXT NOT NULL UNIQUE)",
+    f"""CREATE TABLE IF NOT EXISTS payout_rows (run_id TEXT NOT NULL,
+        {', '.join('remark_id INTEGER REFERENCES remarks (remark_id)' if col == 'remark_id' else f'{col} TEXT' for col in SQLITE_ROW_COLUMNS)})""",
+    "CREATE INDEX IF NOT EXISTS payout_rows_lookup ON payout_rows (cluster_code, veh_type, vehicle, bike_make)",
+    "CREATE INDEX IF NOT EXISTS payout_rows_month_cluster ON payout_rows (slab_month, cluster_code)",
+    "CREATE INDEX IF NOT EXISTS payout_rows_run ON payout_rows (run_id)",
+    f"""CREATE VIEW IF NOT EXISTS payout_rows_with_remarks AS
+        SELECT p.run_id, {', '.join('r.remark' if col == 'remark' else f'p.{col}' for col in OUTPUT_COLUMNS)}
+        FROM payout_rows p LEFT JOIN remarks r USING (remark_id)""",
+    """CREATE TABLE IF NOT EXISTS runs (
+        run_id TEXT PRIMARY KEY, source_file TEXT, output_file TEXT, slab_months TEXT, row_count INTEGER,
+        processed_at TEXT, keywords_config_hash TEXT)""",
+]
 
-                fuel_types_from_header_t2 = base_details_t2.pop("found_fuel_types_col_header", [])
-                if not fuel_types_from_header_t2: fuel_types_from_header_t2 = [base_details_t2.get("fuel_type")]
+def frame_column_values(output_df, col):
+    # Plain Python values of one output column, with None for missing.
+    column = output_df[col]
+    return column.astype(object).where(column.notna(), None).tolist()
+
+def sqlite_remark_ids(connection, remark_lookup_df):
+    # Database remark_id of each frame-local remark_id (position in the lookup).
+    # Only this frame's remarks are looked up, through the UNIQUE index on remark.
+    connection.execute("CREATE TEMP TABLE frame_remarks (local_id INTEGER PRIMARY KEY, remark TEXT NOT NULL)")
+    connection.executemany("INSERT INTO frame_remarks VALUES (?, ?)", enumerate(remark_lookup_df["remark"]))
+    connection.execute("INSERT OR IGNORE INTO remarks (remark) SELECT remark FROM frame_remarks")
+    remark_ids = [remark_id for _, remark_id in connection.execute(
+        "SELECT f.local_id, r.remark_id FROM frame_remarks f JOIN remarks r USING (remark) ORDER BY f.local_id")]
+    connection.execute("DROP TABLE temp.frame_remarks")
+    return remark_ids
+
+def sqlite_layout_error(connection):
+    # None if the database is new or already in SQLITE_SCHEMA_VERSION's layout.
+    user_version = connection.execute("PRAGMA user_version").fetchone()[0]
+    if user_version == SQLITE_SCHEMA_VERSION:
+        return None
+    if user_version == 0 and not connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'payout_rows'").fetchone():
+        return None
+    return (f"database layout version {user_version} is not the current {SQLITE_SCHEMA_VERSION} "
+            f"(payout_rows now stores remark_id into a remarks table); export to a new database file")
+
+def open_sqlite_export(db_path):
+    connection = sqlite3.connect(db_path)
+    try:
+        layout_error = sqlite_layout_error(connection)
+        if layout_error:
+            raise ValueError(f"{db_path}: {layout_error}")
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        with connection:
+            for statement in SQLITE_SCHEMA:
+                connection.execute(statement)
+            connection.execute(f"PRAGMA user_version = {SQLITE_SCHEMA_VERSION}")
+    except BaseException:
+        connection.close()
+        raise
+    return connection
+
+def export_to_sqlite(output_df, db_path, run_id, source_file, output_file=None):
+    import datetime
+    coded_df, remark_lookup_df = split_remark_lookup(output_df)
+    slab_months = ",".join(sorted({str(month) for month in output_df["slab_month"].dropna().unique()}))
+    connection = open_sqlite_export(db_path)
+    try:
+        with connection:
+            db_remark_ids = sqlite_remark_ids(connection, remark_lookup_df)
+            remark_id_values = [None if code < 0 else db_remark_ids[code] for code in coded_df["remark_id"].tolist()]
+            rows = zip([run_id] * len(coded_df), *(remark_id_values if col == "remark_id" else frame_column_values(coded_df, col)
+                                                   for col in SQLITE_ROW_COLUMNS))
+            replaced = connection.execute("DELETE FROM payout_rows WHERE run_id = ?", (run_id,)).rowcount
+            connection.executemany(f"INSERT INTO payout_rows (run_id, {', '.join(SQLITE_ROW_COLUMNS)}) VALUES ({', '.join('?' * (len(SQLITE_ROW_COLUMNS) + 1))})", rows)
+            connection.execute("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                               (run_id, os.path.abspath(source_file), output_file and os.path.abspath(output_file), slab_months, len(output_df),
+                                datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"), KEYWORDS.get("config_hash")))
+    finally:
+        connection.close()
+    action = f"replaced {replaced} earlier rows of this grid with" if replaced else "inserted"
+    print(f"INFO: sqlite: {action} {len(output_df)} rows ({len(remark_lookup_df)} distinct remarks) for run {run_id} ({slab_months}) in {db_path}")
+    return len(output_df)
+
+
+# --- Profiling ---
+# Hotspot groups: (label, ((module file suffix, function name), ...)). Module
+# suffix None means this engine file. Profiled runs buffer the parsed rows
+# (process_workbook buffer_rows) before write_rows_streaming, which would
+# otherwise pull rows through the reader and parser inside its own time.
+PROFILE_HOTSPOT_GROUPS = [
+    ("parse_percentage_cell_text", ((None, "parse_percentage_cell_text"),)),
+    ("parse_column_header_text", ((None, "parse_column_header_text"),)),
+    ("cell lexer", ((None, "tokenize_cell_text"), (None, "segment_keyword_facts"), (None, "associate_line_percentages"))),
+    ("reader", (("pandas/io/excel/_base.py", "read_excel"), ("pandas/io/excel", "load_workbook"), (None, "read_merge_map"))),
+    ("writer", (("pandas/core/generic.py", "to_excel"), (None, "write_rows_streaming"))),
+]
+PROFILE_TOP_FUNCTIONS = 15
+
+def profile_group_of(file_path, function_name):
+    file_path = (file_path or "").replace("\\", "/")
+    for group_label, group_functions in PROFILE_HOTSPOT_GROUPS:
+        for file_suffix, group_function_name in group_functions:
+            if function_name != group_function_name: continue
+            if file_suffix is None:
+                if os.path.basename(file_path) == os.path.basename(__file__): return group_label
+            elif file_suffix in file_path:
+                return group_label
+    return None
 
-                specific_vehicles_from_header_t2 = base_details_t2.pop("header_specific_vehicles_list", [])
-                if not specific_vehicles_from_header_t2: specific_vehicles_from_header_t2 = [base_details_t2.get("vehicle")]
+def group_cprofile_stats(stats):
+    # Cumulative seconds and calls per hotspot group. An entry called directly by
+    # another entry of the same group is already inside that entry's cumulative
+    # time, so it is not added again.
+    group_totals = {group_label: [0, 0.0] for group_label, _ in PROFILE_HOTSPOT_GROUPS}
+    for func_key, (_, num_calls, _, cumulative_time, callers) in stats.stats.items():
+        group_label = profile_group_of(func_key[0], func_key[2])
+        if group_label is None: continue
+        if any(profile_group_of(caller_key[0], caller_key[2]) == group_label for caller_key in callers): continue
+        group_totals[group_label][0] += num_calls
+        group_totals[group_label][1] += cumulative_time
+    return group_totals, stats.total_tt
+
+def group_sampling_frames(root_frame):
+    # Same grouping over a pyinstrument call tree; "calls" are distinct call sites.
+    def frame_time(frame):
+        return frame.time() if callable(frame.time) else frame.time
+    group_totals = {group_label: [0, 0.0] for group_label, _ in PROFILE_HOTSPOT_GROUPS}
+    pending_frames = [(root_frame, None)]
+    while pending_frames:
+        frame, enclosing_group = pending_frames.pop()
+        group_label = profile_group_of(frame.file_path, frame.function)
+        if group_label is not None and group_label != enclosing_group:
+            group_totals[group_label][0] += 1
+            group_totals[group_label][1] += frame_time(frame)
+        pending_frames.extend((child, group_label or enclosing_group) for child in frame.children)
+    return group_totals, frame_time(root_frame)
+
+def print_hotspot_summary(title, group_totals, total_seconds):
+    print(f"\nINFO: profile: Hotspots for {title} (total {total_seconds:.3f}s)")
+    print(f"  {'group':<30} {'calls':>10} {'cum s':>9} {'share':>7}")
+    for group_label, (num_calls, cumulative_time) in group_totals.items():
+        share = cumulative_time / total_seconds * 100 if total_seconds else 0.0
+        print(f"  {group_label:<30} {num_calls:>10} {cumulative_time:>9.3f} {share:>6.1f}%")
+
+def print_top_functions(stats, limit=PROFILE_TOP_FUNCTIONS):
+    print(f"  Top {limit} functions by own time:")
+    top_entries = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:limit]
+    for (file_path, line_no, function_name), (_, num_calls, own_time, cumulative_time, _) in top_entries:
+        location = f"{os.path.basename(file_path)}:{line_no}" if line_no else file_path
+        print(f"    {own_time:>8.3f}s own {cumulative_time:>8.3f}s cum {num_calls:>9} calls  {function_name} ({location})")
+
+def sampling_profiler_available():
+    try:
+        import pyinstrument  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def run_profiled(work, profile_base_path, profiler_kind="auto"):
+    # Runs work() under cProfile (writes <base>.pstats) or, when pyinstrument is
+    # installed and requested/auto, the sampling profiler (writes
+    # <base>.speedscope.json). Returns (result, profile file path, cProfile stats or None).
+    if profiler_kind == "sampling" or (profiler_kind == "auto" and sampling_profiler_available()):
+        from pyinstrument import Profiler
+        from pyinstrument.renderers import SpeedscopeRenderer
+        profiler = Profiler()
+        profiler.start()
+        try:
+            result = work()
+        finally:
+            profiler.stop()
+            profile_path = f"{profile_base_path}.speedscope.json"
+            with open(profile_path, "w", encoding="utf-8") as profile_file:
+                profile_file.write(profiler.output(renderer=SpeedscopeRenderer()))
+            group_totals, total_seconds = group_sampling_frames(profiler.last_session.root_frame())
+            print_hotspot_summary(os.path.basename(profile_base_path), group_totals, total_seconds)
+            print(f"INFO: profile: Sampling profile saved to: {profile_path}")
+        return result, profile_path, None
+
+    import cProfile
+    import pstats
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        result = work()
+    finally:
+        profiler.disable()
+        profile_path = f"{profile_base_path}.pstats"
+        profiler.dump_stats(profile_path)
+        stats = pstats.Stats(profile_path)
+        group_totals, total_seconds = group_cprofile_stats(stats)
+        print_hotspot_summary(os.path.basename(profile_base_path), group_totals, total_seconds)
+        print_top_functions(stats)
+        print(f"INFO: profile: cProfile stats saved to: {profile_path}")
+    return result, profile_path, stats
+
+
+# --- Regex Counters ---
+# Optional per-pattern accounting (--regex-stats). Every compiled pattern the
+# engine holds (module constants, the per-code special cluster patterns, the
+# attribute extractor regexes and cached_regex() patterns) is swapped for a
+# CountingPattern that records calls, time and how many calls matched.
+# Extractor results are memoized per text, so their counts are real scans only.
+# The vectorized pandas .str calls in classify_cell_block take their pattern as a
+# string and are timed under named counters instead (record_vectorized_regex).
+# Tables parsed on the process pool count in the workers, which send their counts
+# back with each chunk.
+REGEX_COUNTERS = None
+
+class CountingPattern:
+    __slots__ = ("name", "pattern", "calls", "matches", "seconds")
+
+    def __init__(self, name, pattern):
+        self.name = name
+        self.pattern = pattern
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.matches = 0
+        self.seconds = 0.0
+
+    def _record(self, started, matched):
+        self.seconds += time.perf_counter() - started
+        self.calls += 1
+        if matched: self.matches += 1
+
+    def search(self, *args, **kwargs):
+        started = time.perf_counter()
+        result = self.pattern.search(*args, **kwargs)
+        self._record(started, result is not None)
+        return result
+
+    def match(self, *args, **kwargs):
+        started = time.perf_counter()
+        result = self.pattern.match(*args, **kwargs)
+        self._record(started, result is not None)
+        return result
+
+    def fullmatch(self, *args, **kwargs):
+        started = time.perf_counter()
+        result = self.pattern.fullmatch(*args, **kwargs)
+        self._record(started, result is not None)
+        return result
+
+    def findall(self, *args, **kwargs):
+        started = time.perf_counter()
+        result = self.pattern.findall(*args, **kwargs)
+        self._record(started, bool(result))
+        return result
+
+    def finditer(self, *args, **kwargs):
+        # Materialized so the scan is timed here rather than in the caller's loop.
+        started = time.perf_counter()
+        result = list(self.pattern.finditer(*args, **kwargs))
+        self._record(started, bool(result))
+        return iter(result)
+
+    def sub(self, repl, string, count=0):
+        started = time.perf_counter()
+        result, num_subs = self.pattern.subn(repl, string, count)
+        self._record(started, num_subs > 0)
+        return result
+
+    def __getattr__(self, attr_name):
+        return getattr(self.pattern, attr_name)
+
+def vectorized_regex_counter(name):
+    counter = REGEX_COUNTERS.get(name)
+    if counter is None:
+        counter = REGEX_COUNTERS[name] = CountingPattern(name, None)
+    return counter
+
+def record_vectorized_regex(name, started, calls, count_matches):
+    # A pandas .str call over many texts at once, charged as `calls` evaluations;
+    # count_matches is only run while counting.
+    if REGEX_COUNTERS is None: return
+    counter = vectorized_regex_counter(name)
+    counter.seconds += time.perf_counter() - started
+    counter.calls += calls
+    counter.matches += count_matches()
+
+def take_regex_counts():
+    # (calls, matches, seconds) per pattern since the last call, for a pool worker
+    # to send back with its chunk; None when not counting.
+    if REGEX_COUNTERS is None: return None
+    regex_counts = {name: (counter.calls, counter.matches, counter.seconds) for name, counter in REGEX_COUNTERS.items() if counter.calls}
+    for counter in REGEX_COUNTERS.values():
+        counter.reset()
+    return regex_counts
+
+def merge_regex_counts(regex_counts):
+    if not regex_counts or REGEX_COUNTERS is None: return
+    for name, (calls, matches, seconds) in regex_counts.items():
+        counter = vectorized_regex_counter(name)
+        counter.calls += calls
+        counter.matches += matches
+        counter.seconds += seconds
+
+def instrument_pattern(name, pattern):
+    if REGEX_COUNTERS is None or isinstance(pattern, CountingPattern):
+        return pattern
+    counter = REGEX_COUNTERS[name] = CountingPattern(name, pattern)
+    return counter
+
+def enable_regex_counters():
+    global REGEX_COUNTERS
+    if REGEX_COUNTERS is not None: return
+    REGEX_COUNTERS = {}
+    SEGMENT_FACTS_CACHE.clear()
+    CELL_ANALYSIS_CACHE.clear()
+    module_globals = globals()
+    for global_name, value in list(module_globals.items()):
+        if isinstance(value, re.Pattern):
+            module_globals[global_name] = instrument_pattern(global_name, value)
+        elif isinstance(value, AttributeExtractor):
+            value.regexes = [(instrument_pattern(f"{global_name}.regexes[{idx}]", regex), normalizer)
+                             for idx, (regex, normalizer) in enumerate(value.regexes if value.regexes is not None else value.compile())]
+            value.cache.clear()
+        elif isinstance(value, dict) and global_name.endswith("_REGEXES"):
+            for key, patterns in value.items():
+                if isinstance(patterns, tuple):
+                    value[key] = tuple(instrument_pattern(f"{global_name}[{key!r}][{idx}]", pattern) for idx, pattern in enumerate(patterns))
+                else:
+                    value[key] = instrument_pattern(f"{global_name}[{key!r}]", patterns)
+    DYNAMIC_REGEX_CACHE.clear()
+
+def reset_regex_counters():
+    for counter in (REGEX_COUNTERS or {}).values():
+        counter.reset()
+    for value in globals().values():
+        if isinstance(value, AttributeExtractor): value.cache.clear()
+
+def print_regex_counters(title):
+    counters = sorted((REGEX_COUNTERS or {}).values(), key=lambda counter: counter.seconds, reverse=True)
+    print(f"\nINFO: regex: Pattern evaluations for {title}")
+    print(f"  {'pattern':<60} {'calls':>9} {'matched':>8} {'rate':>7} {'total ms':>9} {'us/call':>8}")
+    for counter in counters:
+        if not counter.calls: continue
+        print(f"  {counter.name[:60]:<60} {counter.calls:>9} {counter.matches:>8} {counter.matches / counter.calls:>6.1%} {counter.seconds * 1000:>9.2f} {counter.seconds / counter.calls * 1e6:>8.2f}")
+    never_matched = [counter.name for counter in counters if counter.calls and not counter.matches]
+    never_called = [counter.name for counter in counters if not counter.calls]
+    if never_matched: print(f"  Evaluated but never matched ({len(never_matched)}): {', '.join(never_matched)}")
+    if never_called: print(f"  Never evaluated ({len(never_called)}): {', '.join(never_called)}")
+
+
+# --- Memory Accounting ---
+# Optional per-stage memory accounting (--memory). Rows stream from the reader
+# through the parser into the writer (or build_output_frame), so each checkpoint
+# charges the memory allocated since the previous one to its stage. With --memory
+# process_workbook buffers the parsed rows first (buffer_rows), so the streaming
+# writer's allocations land in "write" rather than "cell parsing"; streaming runs
+# report that buffer as "row buffer" where frame exports report "frame build".
+# A tracemalloc snapshot is taken at each checkpoint only; the tracker's own
+# allocations (the per-site size maps it keeps between them) are left out.
+MEMORY_TOP_SITES = 5
+MEMORY_TRACKER = None
+
+def read_rss_bytes():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as statm_file:
+            return int(statm_file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def format_bytes(num_bytes):
+    if num_bytes is None: return "n/a"
+    return f"{num_bytes / (1024 * 1024):.1f} MiB"
+
+class MemoryTracker:
+    def __init__(self, top_sites=MEMORY_TOP_SITES):
+        import inspect
+        self.top_sites = top_sites
+        self.stage_stats = {}
+        source_lines, first_line = inspect.getsourcelines(type(self))
+        self.own_lines = range(first_line, first_line + len(source_lines))
+        self.started_tracing = not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start()
+        self.last_sizes = self.site_sizes()
+        self.last_current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def is_own_site(self, frame):
+        if frame.filename == tracemalloc.__file__: return True
+        return frame.filename == __file__ and frame.lineno in self.own_lines
+
+    def site_sizes(self):
+        # Sizes per allocating source line; the snapshot itself is dropped straight
+        # away so it does not count towards the next stage. Own sites are dropped
+        # from the grouped statistics, which is far cheaper than filter_traces()
+        # over every trace.
+        site_stats = tracemalloc.take_snapshot().statistics("lineno")
+        return {str(stat.traceback[0]): stat.size for stat in site_stats if not self.is_own_site(stat.traceback[0])}
+
+    def checkpoint(self, stage):
+        current, peak = tracemalloc.get_traced_memory()
+        rss = read_rss_bytes()
+        sizes = self.site_sizes()
+        stage_entry = self.stage_stats.setdefault(stage, {"checkpoints": 0, "peak": 0, "net": 0, "rss": None, "sites": defaultdict(int)})
+        stage_entry["checkpoints"] += 1
+        stage_entry["peak"] = max(stage_entry["peak"], peak)
+        stage_entry["net"] += current - self.last_current
+        if rss is not None: stage_entry["rss"] = max(stage_entry["rss"] or 0, rss)
+        for site in sizes.keys() | self.last_sizes.keys():
+            size_diff = sizes.get(site, 0) - self.last_sizes.get(site, 0)
+            if size_diff: stage_entry["sites"][site] += size_diff
+        self.last_sizes = sizes
+        self.last_current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def report(self, title):
+        print(f"\nINFO: memory: Stage memory for {title}")
+        print(f"  {'stage':<14} {'checkpoints':>11} {'peak traced':>13} {'net traced':>12} {'RSS':>12}")
+        for stage, stage_entry in self.stage_stats.items():
+            print(f"  {stage:<14} {stage_entry['checkpoints']:>11} {format_bytes(stage_entry['peak']):>13} {format_bytes(stage_entry['net']):>12} {format_bytes(stage_entry['rss']):>12}")
+        for stage, stage_entry in self.stage_stats.items():
+            top_sites = sorted(stage_entry["sites"].items(), key=lambda item: item[1], reverse=True)[:self.top_sites]
+            top_sites = [(site, size_diff) for site, size_diff in top_sites if size_diff > 0]
+            if not top_sites: continue
+            print(f"  Top allocation sites during {stage}:")
+            for site, size_diff in top_sites:
+                print(f"    {format_bytes(size_diff):>12}  {site}")
+
+    def close(self):
+        if self.started_tracing:
+            tracemalloc.stop()
+
+def memory_checkpoint(stage):
+    if MEMORY_TRACKER is not None:
+        MEMORY_TRACKER.checkpoint(stage)
+
+
+# --- Batch Manifest ---
+# Batch runs record every input in a JSON manifest (content hash, status, output
+# path, timing, row count, error) rewritten atomically after each change, so an
+# interrupted or partly failed run resumes without redoing finished workbooks.
+# Failed inputs are copied into the quarantine folder with their traceback.
+BATCH_MANIFEST_FILENAME = "icici_batch_manifest.json"
+QUARANTINE_DIRNAME = "quarantine"
+HASH_CHUNK_SIZE = 1 << 20
+
+def file_content_hash(path):
+    content_hash = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as input_file:
+        for chunk in iter(lambda: input_file.read(HASH_CHUNK_SIZE), b""):
+            content_hash.update(chunk)
+    return content_hash.hexdigest()
+
+class BatchManifest:
+    def __init__(self, manifest_path, quarantine_dir=None):
+        self.manifest_path = manifest_path
+        self.quarantine_dir = quarantine_dir or os.path.join(os.path.dirname(os.path.abspath(manifest_path)), QUARANTINE_DIRNAME)
+        self.entries = {}
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+                self.entries = json.load(manifest_file).get("entries", {})
+            print(f"INFO: manifest: Resuming from {manifest_path} ({len(self.entries)} entries)")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"WARN: manifest: Could not read {manifest_path} ({e}). Starting a new manifest.")
 
-                for spec_veh_t2 in specific_vehicles_from_header_t2:
-                    for ft_t2 in fuel_types_from_header_t2:
-                        current_base_details_t2_for_iter = base_details_t2.copy()
-                        if spec_veh_t2: current_base_details_t2_for_iter["vehicle"] = spec_veh_t2
-                        if ft_t2: current_base_details_t2_for_iter["fuel_type"] = ft_t2
-                        
-                        if rto_cluster_val_t2_orig == "ANDAMAN&NICOBAR": 
-                             print(f"DETAILED DEBUG: process_sheet (Table 2): Passing to parse_percentage_cell_text for RTO '{rto_cluster_val_t2_orig}', ColHeader '{col_header_text_t2_orig}', CellValue '{cell_value_t2_orig}' with main_table2_context: {main_table2_context}") # KEEP
-                        parsed_rows_t2 = parse_percentage_cell_text(str(cell_value_t2_orig), current_base_details_t2_for_iter, str(rto_cluster_val_t2_orig), main_table2_context)
-                        all_rows_for_sheet.extend(parsed_rows_t2)
+    def save(self):
+        manifest_dir = os.path.dirname(os.path.abspath(self.manifest_path))
+        os.makedirs(manifest_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=".manifest_", suffix=".tmp", dir=manifest_dir)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as temp_file:
+                json.dump({"version": 1, "entries": self.entries}, temp_file, indent=2, sort_keys=True)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+            os.replace(temp_path, self.manifest_path)
+        except BaseException:
+            if os.path.exists(temp_path): os.remove(temp_path)
+            raise
+
+    def should_skip(self, input_path, input_hash, retry_failed=False):
+        entry = self.entries.get(os.path.abspath(input_path))
+        if entry is None or entry.get("input_hash") != input_hash:
+            return False
+        if entry.get("status") == "done":
+            return not entry.get("output_path") or os.path.exists(entry["output_path"])
+        return entry.get("status") == "failed" and not retry_failed
+
+    def mark_running(self, input_path, input_hash):
+        self.entries[os.path.abspath(input_path)] = {"input_hash": input_hash, "status": "running",
+                                                     "started_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        self.save()
+
+    def mark_done(self, input_path, output_path, row_count, seconds):
+        entry = self.entries[os.path.abspath(input_path)]
+        entry.update(status="done", output_path=os.path.abspath(output_path) if output_path else None,
+                     row_count=row_count, seconds=round(seconds, 3))
+        entry.pop("error", None)
+        entry.pop("quarantine_path", None)
+        self.save()
+
+    def mark_failed(self, input_path, error_text, seconds):
+        # Returns the quarantine copy's path, or None if it could not be made (input
+        # gone, folder not writable); the failure is recorded either way.
+        entry = self.entries[os.path.abspath(input_path)]
+        quarantine_path = os.path.join(self.quarantine_dir, f"{entry['input_hash'][:12]}_{os.path.basename(input_path)}")
+        try:
+            os.makedirs(self.quarantine_dir, exist_ok=True)
+            shutil.copy2(input_path, quarantine_path)
+            with open(quarantine_path + ".error.txt", "w", encoding="utf-8") as error_file:
+                error_file.write(error_text)
+        except OSError as e:
+            print(f"WARN: manifest: Could not quarantine {input_path} ({e}). Recording the failure without a copy.")
+            quarantine_path = None
+        entry.update(status="failed", error=error_text.strip().splitlines()[-1], quarantine_path=quarantine_path,
+                     seconds=round(seconds, 3))
+        self.save()
+        return quarantine_path
+
+    def report(self):
+        status_counts = defaultdict(int)
+        for entry in self.entries.values():
+            status_counts[entry.get("status")] += 1
+        print(f"INFO: manifest: {dict(status_counts)} recorded in {self.manifest_path}")
 
-    return all_rows_for_sheet
 
 # --- Main Execution ---
-if __name__ == "__main__":
-    excel_file_path = input("Please provide the path to the ICICI CV grid Excel file: ")
-
-    if not os.path.exists(excel_file_path):
-        print(f"Error: File not found at {excel_file_path}")
-    else:
+EXCEL_INPUT_EXTENSIONS = (".xlsx", ".xlsm", ".xlsb", ".xls")
+
+def collect_input_paths(paths):
+    # Files are taken as given; directories contribute their grids, skipping our
+    # own processed outputs and Excel "~$" lock files.
+    input_paths = []
+    for path in paths:
+        if os.path.isdir(path):
+            for file_name in sorted(os.listdir(path)):
+                file_stem, file_ext = os.path.splitext(file_name)
+                if file_name.startswith(("~$", "processed_")) or file_stem.endswith("_processed"): continue
+                if file_ext.lower() in EXCEL_INPUT_EXTENSIONS:
+                    input_paths.append(os.path.join(path, file_name))
+        else:
+            input_paths.append(path)
+    return input_paths
+
+def process_workbook(excel_file_path, output_dir=None, dedup=False, dedup_memory_limit=None, dedup_spill_dir=None, buffer_rows=False):
+    # buffer_rows (--profile, --memory): parse every row before the writer starts,
+    # so the streaming writer is not charged for the reading and parsing it would
+    # otherwise drive by pulling rows.
+    rows = iter_rows(excel_file_path)
+    if not dedup:
+        return write_workbook_outputs(rows, excel_file_path, output_dir, buffer_rows=buffer_rows)
+    deduplicator = RowDeduplicator(dedup_memory_limit, dedup_spill_dir)
+    try:
+        return write_workbook_outputs(deduplicator.filter(rows), excel_file_path, output_dir, deduplicator, buffer_rows)
+    finally:
+        deduplicator.close()
+
+def write_workbook_outputs(rows, excel_file_path, output_dir=None, deduplicator=None, buffer_rows=False):
+    output_filename = f"processed_{os.path.splitext(os.path.basename(excel_file_path))[0]}.xlsx"
+    if output_dir: output_filename = os.path.join(output_dir, output_filename)
+
+    if not (PARQUET_DATASET_DIR or SQLITE_EXPORT_PATH):
+        # No frame-based export: rows go straight to the writer, so the whole
+        # output is never held in memory (unless buffer_rows asks for it).
+        if buffer_rows:
+            rows = iter(list(rows))
+            memory_checkpoint("row buffer")
+        first_row = next(rows, None)
+        row_count = write_rows_streaming(itertools.chain([first_row], rows), output_filename) if first_row is not None else 0
+        memory_checkpoint("write")
+        if deduplicator: deduplicator.report()
+        if row_count:
+            print(f"\nSuccessfully processed. Output saved to: {output_filename}")
+            return output_filename, row_count
+        print("\nNo data processed. The output file was not created.")
+        return None, 0
+
+    output_df = build_output_frame(rows)
+    memory_checkpoint("frame build")
+    if deduplicator: deduplicator.report()
+
+    if not output_df.empty:
+        output_df.to_excel(output_filename, index=False)
+        memory_checkpoint("write")
+        run_id = file_content_hash(excel_file_path)
+        if PARQUET_DATASET_DIR:
+            write_parquet_dataset(output_df, PARQUET_DATASET_DIR, run_id)
+            memory_checkpoint("parquet")
+        if SQLITE_EXPORT_PATH:
+            export_to_sqlite(output_df, SQLITE_EXPORT_PATH, run_id, excel_file_path, output_filename)
+            memory_checkpoint("sqlite")
+        print(f"\nSuccessfully processed. Output saved to: {output_filename}")
+        return output_filename, len(output_df)
+    print("\nNo data processed. The output file was not created.")
+    return None, 0
+
+def main(argv=None):
+    global MEMORY_TRACKER, PARALLEL_TABLE_WORKERS, PARALLEL_TABLE_PARTITION, PARQUET_DATASET_DIR, PARQUET_PARTITION_COLUMNS, SQLITE_EXPORT_PATH
+    import argparse
+    arg_parser = argparse.ArgumentParser(description="Parse ICICI CV grid workbooks into payout rows.")
+    arg_parser.add_argument("paths", nargs="*", help="Grid workbooks or folders of grids (prompted for if omitted).")
+    arg_parser.add_argument("--profile", action="store_true", help="Profile each workbook and print hotspots grouped by parser function.")
+    arg_parser.add_argument("--profiler", choices=["auto", "cprofile", "sampling"], default="auto",
+                            help="auto uses pyinstrument (sampling, speedscope output) when installed, else cProfile.")
+    arg_parser.add_argument("--profile-dir", default=".", help="Where profile files are written (default: current folder).")
+    arg_parser.add_argument("--memory", action="store_true", help="Report tracemalloc/RSS peaks and top allocation sites per pipeline stage.")
+    arg_parser.add_argument("--regex-stats", action="store_true", help="Count calls, time and match rate for every regex the engine evaluates.")
+    arg_parser.add_argument("--output-dir", help="Where processed outputs are written (default: current folder).")
+    arg_parser.add_argument("--manifest", help=f"Batch manifest to record and resume from (default for several inputs: {BATCH_MANIFEST_FILENAME} in the output folder).")
+    arg_parser.add_argument("--quarantine-dir", help=f"Where failed inputs are copied (default: {QUARANTINE_DIRNAME}/ next to the manifest).")
+    arg_parser.add_argument("--retry-failed", action="store_true", help="Reprocess inputs the manifest records as failed.")
+    arg_parser.add_argument("--table-workers", type=int, default=PARALLEL_TABLE_WORKERS,
+                            help=f"Parse tables of {PARALLEL_TABLE_MIN_CELLS}+ cells in row chunks on this many processes (default: serial).")
+    arg_parser.add_argument("--table-partition", choices=("cost", "rows"), default=PARALLEL_TABLE_PARTITION,
+                            help="How --table-workers chunks a table: equal estimated parse cost (default) or equal row counts.")
+    arg_parser.add_argument("--parquet-dataset", help="Also append each output to this partitioned Parquet dataset folder (needs pyarrow).")
+    arg_parser.add_argument("--parquet-partition-by", default=",".join(PARQUET_PARTITION_COLUMNS),
+                            help="Comma-separated output columns the Parquet dataset is partitioned by (default: %(default)s; e.g. slab_month,veh_type).")
+    arg_parser.add_argument("--sqlite-db", help="Also load each output into this SQLite database (payout_rows and runs tables).")
+    arg_parser.add_argument("--dedup", action="store_true", help="Drop exact-duplicate output rows before writing.")
+    arg_parser.add_argument("--dedup-memory-limit", type=int, metavar="N",
+                            help="With --dedup, spill row fingerprints to a temporary SQLite file past N in memory (default: no limit).")
+    arg_parser.add_argument("--dedup-spill-dir", help="Folder for the --dedup spill file (default: the system temp folder).")
+    args = arg_parser.parse_args(argv)
+    if (args.dedup_memory_limit is not None or args.dedup_spill_dir) and not args.dedup:
+        arg_parser.error("--dedup-memory-limit and --dedup-spill-dir need --dedup")
+    if args.dedup_memory_limit is not None and args.dedup_memory_limit < 1:
+        arg_parser.error("--dedup-memory-limit must be at least 1")
+    if args.dedup_spill_dir: os.makedirs(args.dedup_spill_dir, exist_ok=True)
+    PARALLEL_TABLE_WORKERS = args.table_workers
+    PARALLEL_TABLE_PARTITION = args.table_partition
+    if args.parquet_dataset:
+        PARQUET_PARTITION_COLUMNS = [col.strip() for col in args.parquet_partition_by.split(",") if col.strip()]
+        unknown_columns = [col for col in PARQUET_PARTITION_COLUMNS if col not in OUTPUT_COLUMNS]
+        if unknown_columns:
+            arg_parser.error(f"--parquet-partition-by: unknown output column(s) {', '.join(unknown_columns)}")
+        if not parquet_available():
+            arg_parser.error("--parquet-dataset needs the pyarrow package (pip install pyarrow)")
+        os.makedirs(args.parquet_dataset, exist_ok=True)
+        PARQUET_DATASET_DIR = args.parquet_dataset
+    if args.sqlite_db:
+        if os.path.dirname(args.sqlite_db): os.makedirs(os.path.dirname(args.sqlite_db), exist_ok=True)
+        if os.path.exists(args.sqlite_db):
+            connection = sqlite3.connect(args.sqlite_db)
+            try:
+                layout_error = sqlite_layout_error(connection)
+            finally:
+                connection.close()
+            if layout_error: arg_parser.error(f"--sqlite-db {args.sqlite_db}: {layout_error}")
+        SQLITE_EXPORT_PATH = args.sqlite_db
+
+    if args.memory or args.profile:
+        # Import pandas (and the openpyxl reader it loads) up front, so the first
+        # workbook's "load" stage and profile do not carry the import cost.
+        pd.DataFrame
+        import openpyxl  # noqa: F401
+    paths = args.paths or [input("Please provide the path to the ICICI CV grid Excel file: ")]
+    if args.regex_stats:
+        enable_regex_counters()
+    input_paths = collect_input_paths(paths)
+    if args.output_dir: os.makedirs(args.output_dir, exist_ok=True)
+    manifest_path = args.manifest or (os.path.join(args.output_dir or ".", BATCH_MANIFEST_FILENAME) if len(input_paths) > 1 else None)
+    manifest = BatchManifest(manifest_path, args.quarantine_dir) if manifest_path else None
+    batch_stats = []
+    workbook_options = {"dedup": args.dedup, "dedup_memory_limit": args.dedup_memory_limit, "dedup_spill_dir": args.dedup_spill_dir,
+                        "buffer_rows": args.profile or args.memory}
+    for excel_file_path in input_paths:
+        if not os.path.exists(excel_file_path):
+            print(f"Error: File not found at {excel_file_path}")
+            continue
+        if manifest:
+            input_hash = file_content_hash(excel_file_path)
+            if manifest.should_skip(excel_file_path, input_hash, args.retry_failed):
+                print(f"INFO: manifest: Skipping {excel_file_path}: already {manifest.entries[os.path.abspath(excel_file_path)]['status']} for this content.")
+                continue
+            manifest.mark_running(excel_file_path, input_hash)
+        started = time.perf_counter()
+        if args.memory:
+            MEMORY_TRACKER = MemoryTracker()
+        if args.regex_stats:
+            reset_regex_counters()
         try:
-            xls = pd.ExcelFile(excel_file_path)
-            all_processed_data = []
-
-            sheet_names_to_process = [xls.sheet_names[0]]
-
-            for sheet_name in sheet_names_to_process:
-                print(f"INFO: Main: Reading sheet: {sheet_name}")
-                df_sheet_raw = pd.read_excel(xls, sheet_name=sheet_name, header=None, keep_default_na=False, na_filter=False)
-
-                if df_sheet_raw.empty or len(df_sheet_raw) < 3:
-                    print(f"WARN: Main: Sheet '{sheet_name}' is empty or too small. Skipping.")
-                    continue
-
-                sheet_data_rows = process_sheet(df_sheet_raw, sheet_name)
-                all_processed_data.extend(sheet_data_rows)
-
-            if all_processed_data:
-                output_df = pd.DataFrame(all_processed_data)
-
-                for col in OUTPUT_COLUMNS:
-                    if col not in output_df.columns:
-                        output_df[col] = None
-                output_df = output_df[OUTPUT_COLUMNS]
-
-                output_filename = f"processed_{os.path.splitext(os.path.basename(excel_file_path))[0]}.xlsx"
-                output_df.to_excel(output_filename, index=False)
-                print(f"\nSuccessfully processed. Output saved to: {output_filename}")
+            if args.profile:
+                os.makedirs(args.profile_dir, exist_ok=True)
+                profile_base_path = os.path.join(args.profile_dir, f"profile_{os.path.basename(excel_file_path)}")
+                (output_path, row_count), _, stats = run_profiled(lambda: process_workbook(excel_file_path, args.output_dir, **workbook_options), profile_base_path, args.profiler)
+                if stats is not None: batch_stats.append(stats)
             else:
-                print("\nNo data processed. The output file was not created.")
-
+                output_path, row_count = process_workbook(excel_file_path, args.output_dir, **workbook_options)
+            if manifest: manifest.mark_done(excel_file_path, output_path, row_count, time.perf_counter() - started)
         except Exception as e:
             print(f"An error occurred: {e}")
             import traceback
-            traceback.print_exc()
\ No newline at end of file
+            traceback.print_exc()
+            if manifest:
+                quarantine_path = manifest.mark_failed(excel_file_path, traceback.format_exc(), time.perf_counter() - started)
+                if quarantine_path: print(f"WARN: manifest: {excel_file_path} quarantined to {quarantine_path}")
+        finally:
+            if args.regex_stats:
+                print_regex_counters(os.path.basename(excel_file_path))
+            if MEMORY_TRACKER is not None:
+                MEMORY_TRACKER.report(os.path.basename(excel_file_path))
+                MEMORY_TRACKER.close()
+                MEMORY_TRACKER = None
+
+    if manifest: manifest.report()
+
+    if len(batch_stats) > 1:
+        combined_stats = batch_stats[0]
+        for stats in batch_stats[1:]:
+            combined_stats.add(stats)
+        group_totals, total_seconds = group_cprofile_stats(combined_stats)
+        print_hotspot_summary(f"batch of {len(batch_stats)} workbooks", group_totals, total_seconds)
+        print_top_functions(combined_stats)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+import os
+import sys
+import time
+import json
+import zipfile
+import argparse
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import iciciparser17 as engine
+
+# Watches a drop folder for ICICI CV grids and runs each new or changed workbook
+# through iciciparser17 on a pool of pre-warmed worker processes.
+#
+#   python iciciwatch.py <drop folder> [--outbox DIR] [--workers N] [--once]
+#
+# Uses inotify (the optional inotify_simple package) to wake up as soon as a
+# file is closed or moved in; without it the folder is polled. A file is only
+# dispatched once its size and mtime have stayed the same for SETTLE_SECONDS and
+# it opens as a complete zip container (.xlsx/.xlsb), so half-copied grids are
+# left alone. Excel "~$" lock files and our own processed_ outputs are skipped
+# (engine.collect_input_paths). Content hashes of dispatched files are kept in
+# SEEN_HASHES_FILE in the output folder, so a re-saved or re-dropped identical
+# grid is not processed twice, including across restarts.
+#
+# Every dispatch is also recorded in the engine's batch manifest in the output
+# folder; a grid that fails is marked failed there and copied to the quarantine
+# folder with its traceback, and is tried again only once its file changes. A
+# file that vanishes before it is hashed, an unwritable state file and a worker
+# crash (the pool is rebuilt, and grids it took down are retried once, each on
+# its own so a second crash is pinned on the right grid) are logged without
+# stopping the watcher.
+WATCH_EXTENSIONS = (".xlsx", ".xlsb")
+POLL_INTERVAL_SECONDS = 2.0
+SETTLE_SECONDS = 3.0
+SEEN_HASHES_FILE = ".iciciwatch_seen.json"
+
+
+def warm_worker():
+    # Pay pandas/openpyxl imports and the large regex compiles once per worker,
+    # not once per grid.
+    engine.pd.DataFrame
+    import openpyxl  # noqa: F401
+    for extractor in (engine.AGE_EXTRACTOR, engine.GVW_EXTRACTOR, engine.SEATING_CAP_EXTRACTOR, engine.ENGINE_TYPE_EXTRACTOR):
+        if extractor.regexes is None: extractor.compile()
+    engine.cell_keyword_phrases()
+
+
+def process_in_worker(input_path, output_dir):
+    started = time.perf_counter()
+    output_path, row_count = engine.process_workbook(input_path, output_dir)
+    return input_path, output_path, row_count, time.perf_counter() - started
+
+
+def is_complete_workbook(path):
+    # .xlsx and .xlsb are zip containers; a partial copy has no central directory yet.
+    try:
+        with zipfile.ZipFile(path) as workbook_zip:
+            return bool(workbook_zip.namelist())
+    except (OSError, zipfile.BadZipFile):
+        return False
+
+
+def open_inotify(folder):
+    try:
+        from inotify_simple import INotify, flags
+    except ImportError:
+        return None
+    inotify = INotify()
+    inotify.add_watch(folder, flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE)
+    return inotify
+
+
+class GridWatcher:
+    def __init__(self, folder, outbox=None, workers=2, settle_seconds=SETTLE_SECONDS, poll_interval=POLL_INTERVAL_SECONDS, quarantine_dir=None):
+        self.folder = folder
+        self.outbox = outbox
+        self.workers = workers
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.pending = {}      # path -> (size, mtime_ns, first seen with this signature)
+        self.dispatched = {}   # path -> (size, mtime_ns) last dispatched
+        self.in_flight = {}    # future -> (path, content hash, dispatched at)
+        self.incomplete = set()  # settled but not (yet) a readable workbook
+        self.crash_retried = set()  # content hashes already re-run after a worker crash
+        self.isolated = set()  # paths to re-run alone after a crash, so a second one is pinned on them
+        state_dir = outbox or folder
+        self.seen_hashes_path = os.path.join(state_dir, SEEN_HASHES_FILE)
+        self.seen_hashes = self.load_seen_hashes()
+        self.manifest = engine.BatchManifest(os.path.join(state_dir, engine.BATCH_MANIFEST_FILENAME), quarantine_dir)
+        self.pool = self.new_pool()
+        self.inotify = open_inotify(folder)
+        print(f"INFO: watch: Watching {folder} ({'inotify' if self.inotify else f'polling every {poll_interval}s'}), "
+              f"{workers} worker(s), outputs to {outbox or 'the input folder'}")
+
+    def load_seen_hashes(self):
+        try:
+            with open(self.seen_hashes_path, "r", encoding="utf-8") as seen_file:
+                return set(json.load(seen_file))
+        except (OSError, ValueError):
+            return set()
+
+    def save_seen_hashes(self):
+        temp_path = self.seen_hashes_path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as seen_file:
+                json.dump(sorted(self.seen_hashes), seen_file)
+            os.replace(temp_path, self.seen_hashes_path)
+        except OSError as e:
+            print(f"WARN: watch: Could not save {self.seen_hashes_path} ({e}). Processed grids are only remembered until restart.")
+
+    def record(self, manifest_method, *args):
+        # Manifest bookkeeping must not stop the watcher either.
+        try:
+            return manifest_method(*args)
+        except OSError as e:
+            print(f"WARN: watch: Could not update {self.manifest.manifest_path} ({e}).")
+            return None
+
+    def new_pool(self):
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=warm_worker)
+
+    def candidate_signatures(self):
+        signatures = {}
+        for path in engine.collect_input_paths([self.folder]):
+            if os.path.splitext(path)[1].lower() not in WATCH_EXTENSIONS: continue
+            try:
+                file_stat = os.stat(path)
+            except OSError:
+                continue
+            signatures[path] = (file_stat.st_size, file_stat.st_mtime_ns)
+        return signatures
+
+    def scan(self):
+        now = time.monotonic()
+        for path, signature in self.candidate_signatures().items():
+            if self.dispatched.get(path) == signature: continue
+            pending_entry = self.pending.get(path)
+            if pending_entry is None or pending_entry[:2] != signature:
+                self.pending[path] = (*signature, now)
+                continue
+            if now - pending_entry[2] < self.settle_seconds: continue
+            if self.in_flight and (path in self.isolated or self.isolated & {in_flight[0] for in_flight in self.in_flight.values()}): continue
+            if not is_complete_workbook(path):
+                if path not in self.incomplete:
+                    print(f"WARN: watch: {os.path.basename(path)} is not a complete workbook yet. Waiting for it to change.")
+                    self.incomplete.add(path)
+                continue
+            self.incomplete.discard(path)
+            del self.pending[path]
+            self.dispatched[path] = signature
+            self.dispatch(path)
+
+    def dispatch(self, path):
+        try:
+            content_hash = engine.file_content_hash(path)
+        except OSError as e:
+            # Renamed or removed since it settled; picked up again if it comes back.
+            print(f"WARN: watch: Could not read {os.path.basename(path)} ({e}). Will retry if it reappears.")
+            self.dispatched.pop(path, None)
+            return
+        if content_hash in self.seen_hashes or any(content_hash == in_flight[1] for in_flight in self.in_flight.values()):
+            print(f"INFO: watch: Skipping {os.path.basename(path)}: same content already processed.")
+            return
+        output_dir = self.outbox or os.path.dirname(path)
+        print(f"INFO: watch: Dispatching {os.path.basename(path)}")
+        try:
+            future = self.pool.submit(process_in_worker, path, output_dir)
+        except BrokenProcessPool:
+            print("WARN: watch: Worker pool is broken (a worker crashed or ran out of memory). Starting a new one.")
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = self.new_pool()
+            future = self.pool.submit(process_in_worker, path, output_dir)
+        self.record(self.manifest.mark_running, path, content_hash)
+        self.in_flight[future] = (path, content_hash, time.perf_counter())
+
+    def collect_finished(self):
+        for future in [future for future in self.in_flight if future.done()]:
+            path, content_hash, dispatched_at = self.in_flight.pop(future)
+            if path in self.isolated and content_hash in self.crash_retried: self.isolated.discard(path)
+            try:
+                _, output_path, row_count, elapsed = future.result()
+            except BrokenProcessPool as e:
+                if content_hash not in self.crash_retried:
+                    # Any grid in flight dies with the pool, not only the culprit.
+                    print(f"WARN: watch: {os.path.basename(path)} was lost to a worker crash. Retrying it once.")
+                    self.crash_retried.add(content_hash)
+                    self.isolated.add(path)
+                    signature = self.dispatched.pop(path, None)
+                    if signature is not None: self.pending[path] = (*signature, float("-inf"))
+                    continue
+                self.record_failure(path, e, dispatched_at)
+                continue
+            except Exception as e:
+                self.record_failure(path, e, dispatched_at)
+                continue
+            self.seen_hashes.add(content_hash)
+            self.save_seen_hashes()
+            self.record(self.manifest.mark_done, path, output_path, row_count, elapsed)
+            print(f"INFO: watch: {os.path.basename(path)} -> {output_path} ({row_count} rows) in {elapsed:.2f}s")
+
+    def record_failure(self, path, error, dispatched_at):
+        # The worker's traceback comes back chained to the exception.
+        error_text = "".join(traceback.format_exception(error))
+        print(f"ERROR: watch: {os.path.basename(path)} failed: {error}")
+        quarantine_path = self.record(self.manifest.mark_failed, path, error_text, time.perf_counter() - dispatched_at)
+        if quarantine_path: print(f"WARN: watch: {os.path.basename(path)} quarantined to {quarantine_path}. It is retried once the file changes.")
+
+    def wait(self):
+        if self.inotify is not None:
+            # Wake on the first event, or after the settle time to re-check pending files.
+            self.inotify.read(timeout=int(self.poll_interval * 1000) if self.pending or self.in_flight else None)
+        else:
+            time.sleep(self.poll_interval)
+
+    def run(self, once=False):
+        try:
+            while True:
+                self.scan()
+                self.collect_finished()
+                if once and not (self.pending.keys() - self.incomplete) and not self.in_flight:
+                    break
+                self.wait()
+        except KeyboardInterrupt:
+            print("\nINFO: watch: Stopping.")
+        finally:
+            self.pool.shutdown(wait=True)
+            self.collect_finished()
+            if self.inotify is not None: self.inotify.close()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Process ICICI CV grids as they land in a folder.")
+    arg_parser.add_argument("folder", help="Drop folder to watch.")
+    arg_parser.add_argument("--outbox", help="Folder for processed outputs (default: next to each input).")
+    arg_parser.add_argument("--workers", type=int, default=2, help="Worker processes kept warm (default: 2).")
+    arg_parser.add_argument("--settle", type=float, default=SETTLE_SECONDS, help="Seconds a file must stay unchanged before it is processed.")
+    arg_parser.add_argument("--poll", type=float, default=POLL_INTERVAL_SECONDS, help="Polling interval when inotify is unavailable.")
+    arg_parser.add_argument("--once", action="store_true", help="Process what is in the folder now, then exit.")
+    arg_parser.add_argument("--quarantine-dir", help=f"Where failed grids are copied (default: {engine.QUARANTINE_DIRNAME}/ in the output folder).")
+    args = arg_parser.parse_args(argv)
+
+    if not os.path.isdir(args.folder):
+        print(f"Error: Folder not found at {args.folder}")
+        sys.exit(1)
+    if args.outbox: os.makedirs(args.outbox, exist_ok=True)
+    GridWatcher(args.folder, args.outbox, args.workers, args.settle, args.poll, args.quarantine_dir).run(once=args.once)
+
+
+if __name__ == "__main__":
+    main()